@@ -0,0 +1,176 @@
+"""Batch PDF export of many timetables, per schedule, per teacher or per room
+
+    python -m app.batch_export --years 1 2 --variants schedule teacher classroom --output timetables.zip
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, groupby
+
+from reportlab.platypus import PageBreak
+
+from app.export import build_pdf, render_schedule_pdf, timetable_elements
+from app.timetable_grid import ScheduleContent
+from db.database import session_scope
+from db.models import AcademicYear, Schedule, ScheduleSlot, Course, Teacher, Classroom
+
+VARIANTS = ('schedule', 'teacher', 'classroom')
+FORMATS = ('zip', 'pdf')
+# Characters not allowed in file names on common file systems
+UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|]+')
+# A single PDF is laid out in one ReportLab build that holds all of its sections in
+# memory; larger selections must use the ZIP export, which streams
+MAX_COMBINED_DOCUMENTS = 200
+
+
+def _file_name(variant, key, name):
+    return f"{variant}s/{key}-{UNSAFE_CHARS.sub('_', name).strip()}.pdf"
+
+
+def iter_documents(session, variant='schedule', schedule_ids=None, year_ids=None, chunk_size=1000):
+    """(file name, ScheduleContent) of each document of the variant, streamed from one ordered query
+
+    Without schedule_ids or year_ids, every saved schedule is exported. Teacher and
+    room documents gather the person's or room's slots across all selected schedules.
+    """
+    key = {'schedule': Schedule.id, 'teacher': Teacher.id, 'classroom': Classroom.id}[variant]
+    query = session.query(
+        key, Schedule.name, Schedule.fitness_score, AcademicYear.name,
+        ScheduleSlot.day_of_week, ScheduleSlot.start_time, ScheduleSlot.end_time,
+        Course.name, Teacher.name, Classroom.name
+    ).select_from(Schedule).join(
+        AcademicYear, Schedule.academic_year_id == AcademicYear.id
+    ).outerjoin(
+        ScheduleSlot, ScheduleSlot.schedule_id == Schedule.id
+    ).outerjoin(
+        Course, ScheduleSlot.course_id == Course.id
+    ).outerjoin(
+        Teacher, ScheduleSlot.teacher_id == Teacher.id
+    ).outerjoin(
+        Classroom, ScheduleSlot.classroom_id == Classroom.id
+    )
+    if schedule_ids is not None:
+        query = query.filter(Schedule.id.in_(schedule_ids))
+    if year_ids is not None:
+        query = query.filter(Schedule.academic_year_id.in_(year_ids))
+    rows = query.order_by(key, ScheduleSlot.id).yield_per(chunk_size)
+
+    for key_id, group in groupby(rows, key=lambda row: row[0]):
+        # Slot-less schedules have no teacher or room
+        if key_id is None:
+            continue
+        group = list(group)
+        slots = tuple(
+            (day, f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}", course, teacher, classroom)
+            for _, _, _, _, day, start, end, course, teacher, classroom in group
+            if day is not None
+        )
+        if variant == 'schedule':
+            _, name, fitness_score, year_name = group[0][:4]
+        else:
+            name = group[0][8] if variant == 'teacher' else group[0][9]
+            year_name = ", ".join(dict.fromkeys(row[3] for row in group))
+            fitness_score = None
+        yield _file_name(variant, key_id, name), ScheduleContent(name, year_name, fitness_score, slots)
+
+
+def render_documents(documents, workers=None):
+    """(file name, PDF bytes) in document order, rendering at most 2 x workers documents ahead"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for name, content in documents:
+            yield name, render_schedule_pdf(content)
+        return
+
+    # spawn keeps workers free of the parent's DB connections and threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        pending = deque()
+        for name, content in documents:
+            pending.append((name, executor.submit(render_schedule_pdf, content)))
+            if len(pending) >= 2 * workers:
+                name, future = pending.popleft()
+                yield name, future.result()
+        while pending:
+            name, future = pending.popleft()
+            yield name, future.result()
+
+
+def export_zip(output, documents, workers=None, max_documents=None):
+    """Write one PDF per document into a ZIP at output (path or binary file); returns the count
+
+    The archive streams, so it has no size limit of its own; with max_documents
+    it raises ValueError once the selection turns out to be larger, leaving a
+    partial archive that the caller discards.
+    """
+    count = 0
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf in render_documents(documents, workers):
+            if count == max_documents:
+                raise ValueError(
+                    f"This export holds at most {max_documents} timetables; "
+                    "export larger selections with python -m app.batch_export"
+                )
+            archive.writestr(name, pdf)
+            count += 1
+    return count
+
+
+def export_combined_pdf(output, documents, max_documents=MAX_COMBINED_DOCUMENTS):
+    """Write all documents as sections of one PDF at output; returns the count
+
+    ReportLab lays out a single document in one process and keeps every section in
+    memory until the build, so this path is not parallel and raises ValueError,
+    before writing anything, for more than max_documents documents.
+    """
+    elements = []
+    count = 0
+    for _, content in documents:
+        if count == max_documents:
+            raise ValueError(f"A single PDF holds at most {max_documents} timetables; export this selection as a ZIP instead")
+        if elements:
+            elements.append(PageBreak())
+        elements += timetable_elements(content)
+        count += 1
+    if count:
+        build_pdf(output, elements)
+    return count
+
+
+def export_timetables(output, schedule_ids=None, year_ids=None, variants=('schedule',), output_format='zip', workers=None, max_documents=None):
+    """Export the selected schedules' timetables in the given variants as a ZIP or one PDF
+
+    max_documents caps either format (ValueError above it); a single PDF is
+    always capped at MAX_COMBINED_DOCUMENTS.
+    """
+    with session_scope() as session:
+        documents = chain.from_iterable(
+            iter_documents(session, variant, schedule_ids, year_ids) for variant in variants
+        )
+        if output_format == 'zip':
+            return export_zip(output, documents, workers, max_documents)
+        return export_combined_pdf(output, documents, min(max_documents or MAX_COMBINED_DOCUMENTS, MAX_COMBINED_DOCUMENTS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schedules', type=int, nargs='+', help="schedule ids (default: all)")
+    parser.add_argument('--years', type=int, nargs='+', help="export every schedule of these academic years")
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=['schedule'])
+    parser.add_argument('--format', choices=FORMATS, default='zip')
+    parser.add_argument('--workers', type=int, default=None, help="render processes for ZIP output (default: CPU count)")
+    parser.add_argument('--output', default='timetables.zip')
+    args = parser.parse_args(argv)
+
+    try:
+        count = export_timetables(args.output, args.schedules, args.years, args.variants, args.format, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Wrote {count} timetables to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,12 @@
 import streamlit as st
 from db.models import Classroom, AcademicYear
-from db.database import get_engine, get_session
+from db.database import get_session
+from app.reference_data import load_years, load_classrooms, invalidate
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("🏫 Classrooms Management")
+    years = load_years()
 
     with st.expander("➕ Add New Classroom"):
         with st.form("add_classroom_form"):
@@ -12,35 +14,34 @@ def render():
             capacity = st.number_input("Capacity", min_value=1, value=30)
             building = st.text_input("Building")
 
-            years = session.query(AcademicYear).all()
             selected_years = st.multiselect(
                 "Academic Years",
-                [y.id for y in years],
-                format_func=lambda id: session.query(AcademicYear).get(id).name
+                list(years),
+                format_func=lambda id: years[id].name
             )
 
             submit = st.form_submit_button("Add")
             if submit and name:
                 classroom = Classroom(name=name, capacity=capacity, building=building)
-                for yid in selected_years:
-                    year = session.query(AcademicYear).get(yid)
-                    classroom.academic_years.append(year)
+                if selected_years:
+                    classroom.academic_years = session.query(AcademicYear).filter(AcademicYear.id.in_(selected_years)).all()
                 session.add(classroom)
                 session.commit()
+                invalidate('classrooms', 'years')
                 st.success("Classroom added successfully!")
 
-    classrooms = session.query(Classroom).all()
+    classrooms = load_classrooms()
     if not classrooms:
         st.info("No classrooms found.")
         return
 
-    for room in classrooms:
+    for room in classrooms.values():
         with st.expander(f"🏫 {room.name}"):
             st.markdown(f"**Capacity:** {room.capacity}")
             st.markdown(f"**Building:** {room.building}")
             st.markdown("**Academic Years:**")
-            for year in room.academic_years:
-                st.markdown(f"- {year.name}")
+            for yid in room.year_ids:
+                st.markdown(f"- {years[yid].name}")
 
             with st.form(f"edit_classroom_{room.id}"):
                 name = st.text_input("Classroom Name", value=room.name)
@@ -48,17 +49,19 @@ def render():
                 building = st.text_input("Building", value=room.building or "")
                 selected_years = st.multiselect(
                     "Academic Years",
-                    [y.id for y in years],
-                    default=[y.id for y in room.academic_years],
-                    format_func=lambda id: session.query(AcademicYear).get(id).name
+                    list(years),
+                    default=list(room.year_ids),
+                    format_func=lambda id: years[id].name
                 )
 
                 update = st.form_submit_button("Update")
                 if update and name:
-                    room.name = name
-                    room.capacity = capacity
-                    room.building = building
-                    room.academic_years = [session.query(AcademicYear).get(yid) for yid in selected_years]
+                    record = session.get(Classroom, room.id)
+                    record.name = name
+                    record.capacity = capacity
+                    record.building = building
+                    record.academic_years = session.query(AcademicYear).filter(AcademicYear.id.in_(selected_years)).all()
                     session.commit()
+                    invalidate('classrooms', 'years')
                     st.success("Classroom updated successfully!")
                     st.rerun()
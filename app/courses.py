@@ -1,10 +1,13 @@
 import streamlit as st
 from db.models import Course, AcademicYear, Teacher
-from db.database import get_engine, get_session
+from db.database import get_session
+from app.reference_data import load_years, load_teachers, load_courses, invalidate
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("📚 Courses Management")
+    years = load_years()
+    teachers = load_teachers()
 
     
     with st.expander("➕ Add New Course"):
@@ -13,39 +16,34 @@ def render():
             code = st.text_input("Course Code")
             credit = st.number_input("Credit Hours", min_value=1, value=3)
 
-            years = session.query(AcademicYear).all()
-            year_ids = st.multiselect("Select Academic Years", [y.id for y in years], format_func=lambda id: session.query(AcademicYear).get(id).name)
+            year_ids = st.multiselect("Select Academic Years", list(years), format_func=lambda id: years[id].name)
 
-            teachers = session.query(Teacher).all()
-            teacher_ids = st.multiselect("Select Professors", [t.id for t in teachers], format_func=lambda id: session.query(Teacher).get(id).name)
+            teacher_ids = st.multiselect("Select Professors", list(teachers), format_func=lambda id: teachers[id].name)
 
             submit = st.form_submit_button("Add")
             if submit and name:
                 course = Course(name=name, code=code, credit_hours=credit)
-                for yid in year_ids:
-                    y = session.query(AcademicYear).get(yid)
-                    if y:
-                        course.academic_years.append(y)
-                for tid in teacher_ids:
-                    t = session.query(Teacher).get(tid)
-                    if t:
-                        course.teachers.append(t)
+                if year_ids:
+                    course.academic_years = session.query(AcademicYear).filter(AcademicYear.id.in_(year_ids)).all()
+                if teacher_ids:
+                    course.teachers = session.query(Teacher).filter(Teacher.id.in_(teacher_ids)).all()
                 session.add(course)
                 session.commit()
+                invalidate('courses', 'years', 'teachers')
                 st.success("Course added successfully!")
 
-    courses = session.query(Course).all()
+    courses = load_courses()
     if not courses:
         st.info("No courses found.")
         return
 
-    for course in courses:
+    for course in courses.values():
         with st.expander(f"📘 {course.name} ({course.code})"):
-            st.markdown(f"**Academic Years:** {', '.join([y.name for y in course.academic_years])}")
+            st.markdown(f"**Academic Years:** {', '.join([years[yid].name for yid in course.year_ids])}")
             st.markdown(f"**Credit Hours:** {course.credit_hours}")
             st.markdown("**Professors:**")
-            for t in course.teachers:
-                st.markdown(f"- {t.name}")
+            for tid in course.teacher_ids:
+                st.markdown(f"- {teachers[tid].name}")
 
             with st.form(f"edit_course_{course.id}"):
                 name = st.text_input("Course Name", value=course.name)
@@ -54,25 +52,27 @@ def render():
 
                 selected_years = st.multiselect(
                     "Academic Years",
-                    [y.id for y in years],
-                    default=[y.id for y in course.academic_years],
-                    format_func=lambda id: session.query(AcademicYear).get(id).name
+                    list(years),
+                    default=list(course.year_ids),
+                    format_func=lambda id: years[id].name
                 )
 
                 selected_teachers = st.multiselect(
                     "Professors",
-                    [t.id for t in teachers],
-                    default=[t.id for t in course.teachers],
-                    format_func=lambda id: session.query(Teacher).get(id).name
+                    list(teachers),
+                    default=list(course.teacher_ids),
+                    format_func=lambda id: teachers[id].name
                 )
 
                 update = st.form_submit_button("Update")
                 if update and name:
-                    course.name = name
-                    course.code = code
-                    course.credit_hours = credit
-                    course.academic_years = [session.query(AcademicYear).get(yid) for yid in selected_years]
-                    course.teachers = [session.query(Teacher).get(tid) for tid in selected_teachers]
+                    record = session.get(Course, course.id)
+                    record.name = name
+                    record.code = code
+                    record.credit_hours = credit
+                    record.academic_years = session.query(AcademicYear).filter(AcademicYear.id.in_(selected_years)).all()
+                    record.teachers = session.query(Teacher).filter(Teacher.id.in_(selected_teachers)).all()
                     session.commit()
+                    invalidate('courses', 'years', 'teachers')
                     st.success("Course updated successfully!")
                     st.rerun()
@@ -1,3 +1,10 @@
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import streamlit as st
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.pagesizes import A4
@@ -6,44 +13,112 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from io import BytesIO
-from db.models import Schedule
-from db.database import get_engine, get_session
+from db.database import get_session
+from app.timetable_grid import DAYS, TIME_SLOTS, build_grid, load_schedule_content
 import arabic_reshaper
 from bidi.algorithm import get_display
 
-TIME_SLOTS = ["08:00-10:00", "10:00-12:00", "12:00-14:00", "14:00-16:00", "16:00-18:00"]
-DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+FONT_NAME = 'Amiri'
+FONT_PATH = 'Amiri-Regular.ttf'
 
-def export_schedule_to_pdf(schedule_id):
-    session = get_session(get_engine())
-    schedule = session.query(Schedule).get(schedule_id)
-    if not schedule:
-        return None
+@lru_cache(maxsize=None)
+def register_font():
+    """Register the Arabic font with ReportLab once per process"""
+    pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
 
-    pdfmetrics.registerFont(TTFont('Amiri', 'Amiri-Regular.ttf'))
+@lru_cache(maxsize=4096)
+def shape(text):
+    """Reshaped, bidi-ordered and markup-escaped text for ReportLab paragraphs; names repeat across cells and schedules"""
+    return html.escape(get_display(arabic_reshaper.reshape(text)), quote=False)
+
+
+class PdfCache:
+    """Rendered PDFs keyed by schedule id, valid for one content version, evicted LRU by total size"""
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def version(content):
+        return hashlib.blake2b(repr(content).encode(), digest_size=16).digest()
+
+    def get(self, schedule_id, version):
+        with self.lock:
+            entry = self.entries.get(schedule_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(schedule_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, schedule_id, version, pdf):
+        with self.lock:
+            previous = self.entries.pop(schedule_id, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            if len(pdf) > self.max_bytes:
+                return
+            self.entries[schedule_id] = (version, pdf)
+            self.size += len(pdf)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_entries': len(self.entries),
+            'cache_bytes': self.size
+        }
+
+
+pdf_cache = PdfCache()
+
 
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """Title, text and cell paragraph styles in the Arabic font"""
+    register_font()
     styles = getSampleStyleSheet()
-    title_style = ParagraphStyle('title', parent=styles['Heading1'], fontName='Amiri', fontSize=18, alignment=TA_CENTER)
-    normal_style = ParagraphStyle('normal', parent=styles['Normal'], fontName='Amiri', fontSize=12, alignment=TA_RIGHT)
-    cell_style = ParagraphStyle('cell', parent=styles['Normal'], fontName='Amiri', fontSize=11, alignment=TA_RIGHT, leading=16)
-
-    grid = {day: {slot: "" for slot in TIME_SLOTS} for day in DAYS}
-    for slot in schedule.slots:
-        day = DAYS[slot.day_of_week]
-        time_key = f"{slot.start_time.strftime('%H:%M')}-{slot.end_time.strftime('%H:%M')}"
-        if time_key in TIME_SLOTS:
-            course_name = get_display(arabic_reshaper.reshape(slot.course.name))
-            teacher_name = get_display(arabic_reshaper.reshape(slot.teacher.name))
-            classroom_name = get_display(arabic_reshaper.reshape(slot.classroom.name))
-            content = f"<b>{course_name}</b><br/><font size=10>{teacher_name}</font><br/><font size=10>{classroom_name}</font>"
-            grid[day][time_key] = Paragraph(content, cell_style)
+    title_style = ParagraphStyle('title', parent=styles['Heading1'], fontName=FONT_NAME, fontSize=18, alignment=TA_CENTER)
+    normal_style = ParagraphStyle('normal', parent=styles['Normal'], fontName=FONT_NAME, fontSize=12, alignment=TA_RIGHT)
+    cell_style = ParagraphStyle('cell', parent=styles['Normal'], fontName=FONT_NAME, fontSize=11, alignment=TA_RIGHT, leading=16)
+    return title_style, normal_style, cell_style
 
+
+def timetable_elements(content):
+    """Flowables of one timetable: heading, details and the day x time table"""
+    title_style, normal_style, cell_style = pdf_styles()
+
+    cells = build_grid(content.slots)
     data = [["Day / Time"] + TIME_SLOTS]
     for day_index, day in enumerate(DAYS):
-        row = [day] + [grid[day][slot] for slot in TIME_SLOTS]
+        row = [day]
+        for time_slot in TIME_SLOTS:
+            entries = cells.get((day_index, time_slot))
+            if not entries:
+                row.append("")
+                continue
+            # Parallel sections are stacked in one cell
+            cell = "<br/><br/>".join(
+                f"<b>{shape(entry.course)}</b><br/><font size=10>{shape(entry.teacher)}</font><br/><font size=10>{shape(entry.classroom)}</font>"
+                for entry in entries
+            )
+            row.append(Paragraph(cell, cell_style))
         data.append(row)
 
     table = Table(data, repeatRows=1, hAlign='CENTER')
@@ -52,7 +127,7 @@ def export_schedule_to_pdf(schedule_id):
         ('TEXTCOLOR', (0,0), (-1,0), colors.black),
         ('ALIGN', (1,1), (-1,-1), 'CENTER'),
         ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('FONTNAME', (0,0), (-1,-1), 'Amiri'),
+        ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
         ('FONTSIZE', (0,0), (-1,-1), 11),
         ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
         ('BACKGROUND', (0,1), (-1,-1), colors.whitesmoke),
@@ -62,15 +137,52 @@ def export_schedule_to_pdf(schedule_id):
     ]))
 
     elements = [
-        Paragraph(get_display(arabic_reshaper.reshape(schedule.name)), title_style),
+        Paragraph(shape(content.name), title_style),
         Spacer(1,12),
-        Paragraph(f"Academic Year: {get_display(arabic_reshaper.reshape(schedule.academic_year.name))}", normal_style),
-        Paragraph(f"Fitness Score: {schedule.fitness_score}%", normal_style),
-        Spacer(1,12),
-        table
+        Paragraph(f"Academic Year: {shape(content.year_name)}", normal_style)
     ]
+    # Teacher and room timetables span several schedules and have no single score
+    if content.fitness_score is not None:
+        elements.append(Paragraph(f"Fitness Score: {content.fitness_score}%", normal_style))
+    elements += [Spacer(1,12), table]
+    return elements
+
 
+def build_pdf(output, elements):
+    """Lay out flowables on A4 pages into a path or binary file object"""
+    doc = SimpleDocTemplate(output, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
     doc.build(elements)
+
+
+def render_schedule_pdf(content):
+    """Build the timetable PDF for a ScheduleContent"""
+    buffer = BytesIO()
+    build_pdf(buffer, timetable_elements(content))
     pdf_data = buffer.getvalue()
     buffer.close()
     return pdf_data
+
+
+def export_schedule_to_pdf(schedule_id, cached_only=False):
+    """PDF bytes of the schedule, rendered only if its current content is not cached
+
+    With cached_only, returns None instead of rendering.
+    """
+    content = load_schedule_content(get_session(), schedule_id)
+    if content is None:
+        return None
+    version = PdfCache.version(content)
+    pdf = pdf_cache.get(schedule_id, version)
+    if pdf is None and not cached_only:
+        pdf = render_schedule_pdf(content)
+        pdf_cache.put(schedule_id, version, pdf)
+    return pdf
+
+
+def pdf_download_button(schedule_id, label, file_name, key):
+    """Download button for a schedule's PDF, rendering it only once the user asks for it"""
+    pdf = export_schedule_to_pdf(schedule_id, cached_only=True)
+    if pdf is None and st.button("📄 Prepare PDF", key=f"prepare_{key}"):
+        pdf = export_schedule_to_pdf(schedule_id)
+    if pdf:
+        st.download_button(label, data=pdf, file_name=file_name, key=key, mime="application/pdf")
@@ -3,18 +3,28 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
-import time
-from db.models import AcademicYear, Course, Schedule
-from db.database import get_engine, get_session
-from core.genetic_scheduler import GeneticScheduler
-from app.export import export_schedule_to_pdf
-
-
-DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-TIME_SLOTS = ["08:00-10:00", "10:00-12:00", "12:00-14:00", "14:00-16:00", "16:00-18:00"]
+from db.models import AcademicYear
+from db.database import get_session, session_scope
+from db.schedule_repository import get_schedule
+from app.export import pdf_download_button
+from app.generation_jobs import get_job_manager
+from app.timetable_grid import TABLE_CSS, grid_html, load_schedule_content
+
+# Generation cap when the run is bounded by a time budget instead
+MAX_GENERATIONS = 100000
+# Share of the initial population seeded from the replaced timetable on a warm start
+WARM_START_SHARE = 0.5
+STOP_REASONS = {
+    'perfect_solution': "a conflict-free timetable was found",
+    'target_fitness': "the target fitness was reached",
+    'stalled': "the fitness stopped improving",
+    'time_budget': "the time budget ran out",
+    'stopped': "the run was stopped",
+    'generations': "all generations were evaluated"
+}
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("🧬 Generate New Timetable")
 
     years = session.query(AcademicYear).all()
@@ -40,98 +50,141 @@ def render():
         return
 
     st.subheader("Genetic Algorithm Settings")
+    stop_mode = st.radio("Stop After", ["Number of Generations", "Time Budget"], horizontal=True)
     col1, col2, col3 = st.columns(3)
     pop_size = col1.slider("Population Size", 10, 200, 50, 10)
-    generations = col2.slider("Number of Generations", 10, 500, 100, 10)
+    if stop_mode == "Time Budget":
+        time_budget = col2.slider("Time Budget (seconds)", 5, 600, 60, 5)
+        generations = MAX_GENERATIONS
+    else:
+        time_budget = None
+        generations = col2.slider("Number of Generations", 10, 500, 100, 10)
     mutation = col3.slider("Mutation Rate", 0.01, 0.5, 0.1, 0.01)
 
+    with st.expander("Early Stopping"):
+        col1, col2 = st.columns(2)
+        stall_generations = col1.number_input("Stop after generations without improvement (0 = off)", 0, 500, 0, 5)
+        target_fitness = col2.slider("Stop at fitness (%)", 1, 100, 100, 1)
+
+    has_schedules = bool(year.schedules)
+    warm_start = st.checkbox(
+        "Revise the latest saved timetable of this year (replaces it when saved)",
+        value=False,
+        disabled=not has_schedules,
+        help="Starts from the latest timetable and converges much faster after small changes to courses, "
+             "professors or availability. The new timetable is saved in its place."
+    )
+    timing = st.checkbox("Record phase timings", value=False)
+
     name = st.text_input("Schedule Name", f"Schedule {year.name} - {datetime.now().strftime('%Y-%m-%d')}")
 
-    if st.button("Generate Timetable"):
-        progress = st.progress(0)
-        status = st.empty()
+    manager = get_job_manager()
+    if manager.is_running(year_id):
+        st.info(f"A timetable for {year.name} is already being generated.")
+    elif st.button("Generate Timetable"):
+        manager.submit(
+            year_id,
+            name,
+            settings={
+                'population_size': pop_size,
+                'generations': generations,
+                'mutation_rate': mutation,
+                'timing': timing
+            },
+            run_options={
+                'stall_generations': stall_generations or None,
+                'target_fitness': target_fitness / 100 if target_fitness < 100 else None,
+                'time_budget': time_budget,
+                'warm_start': WARM_START_SHARE if warm_start and has_schedules else None
+            }
+        )
 
-        # بدء قياس الوقت
-        start_time = time.time()
+    # Jobs live in the process-wide manager, so a refresh or another browser still finds them
+    jobs = manager.jobs_for_year(year_id)
+    if not jobs:
+        return
 
-        scheduler = GeneticScheduler(
-            session=session,
-            academic_year_id=year_id,
-            population_size=pop_size,
-            generations=generations,
-            mutation_rate=mutation
-        )
+    st.subheader("Generation Jobs")
+    active = any(job.status in ('queued', 'running') for job in jobs)
+    # Only the job panel reruns while polling, the rest of the page stays responsive
+    st.fragment(run_every=1 if active else None)(render_jobs)(manager, year_id, active)
+
+
+def render_jobs(manager, year_id, polling):
+    # Fragment reruns skip the page's session scope, so open one here
+    with session_scope() as session:
+        render_job_list(session, manager, year_id, polling)
+
+
+def render_job_list(session, manager, year_id, polling):
+    snapshots = [job.snapshot() for job in manager.jobs_for_year(year_id)]
+    for job in snapshots:
+        with st.container(border=True):
+            st.markdown(f"**{job['name']}**")
+            if job['status'] == 'queued':
+                st.text("Waiting for a free worker...")
+            elif job['status'] == 'running':
+                info = job['progress']
+                if not info:
+                    st.progress(0)
+                    st.text("Loading data...")
+                    continue
+                if job['time_budget']:
+                    st.progress(min(100, int(info['elapsed'] / job['time_budget'] * 100)))
+                else:
+                    st.progress(min(100, int((info['generation']+1)/job['generations'] * 100)))
+                st.text(
+                    f"Generation {info['generation']+1} - Best Fitness: {int(info['best_fitness']*100)}% "
+                    f"- Average Fitness: {int(info['avg_fitness']*100)}%"
+                )
+            elif job['status'] == 'failed':
+                st.error(f"Generation failed: {job['error']}")
+                if st.button("Dismiss", key=f"dismiss_{job['id']}"):
+                    dismiss_job(manager, job['id'])
+            else:
+                render_result(session, job)
+                if st.button("Dismiss", key=f"dismiss_{job['id']}"):
+                    dismiss_job(manager, job['id'])
+
+    if polling and not any(job['status'] in ('queued', 'running') for job in snapshots):
+        st.rerun()
+
+
+def dismiss_job(manager, job_id):
+    manager.discard(job_id)
+    st.rerun()
+
+
+def render_timings(timings):
+    with st.expander("⏱️ Phase Timings"):
+        st.caption("Phases can contain other phases (evolve_population includes calculate_fitness), so the times overlap.")
+        st.dataframe(pd.DataFrame([
+            {
+                'Phase': phase,
+                'Total (s)': round(stats['seconds'], 4),
+                'Calls': stats['calls'],
+                'Per Call (ms)': round(stats['seconds'] / stats['calls'] * 1000, 3)
+            }
+            for phase, stats in timings['phases'].items()
+        ]), hide_index=True, use_container_width=True)
+        if timings['generations']:
+            st.markdown("**Per-generation time (s)**")
+            st.line_chart(pd.DataFrame(timings['generations']).fillna(0))
+
+
+def render_result(session, job):
+    saved = get_schedule(session, job['schedule_id'], with_slots=False)
+    if saved is None:
+        st.warning("The generated timetable has been deleted.")
+        return
+
+    st.info(f"⏱️ Time taken to create the table: {job['elapsed']:.2f} seconds (stopped because {STOP_REASONS[job['stop_reason']]})")
+
+    st.success(f"Timetable generated successfully with fitness score: {int(job['fitness']*100)}%")
+    if job['timings']:
+        render_timings(job['timings'])
+    content = load_schedule_content(session, saved.id)
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+    st.markdown(grid_html(content.slots), unsafe_allow_html=True)
 
-        def update_progress(info):
-            progress.progress(min(100, int((info['generation']+1)/generations * 100)))
-            status.text(f"Generation {info['generation']+1} - Best Fitness: {int(info['best_fitness']*100)}%")
-
-        best_schedule, fitness = scheduler.run(progress_callback=update_progress)
-        saved = scheduler.save_schedule(best_schedule, name=name)
-
-        # حساب الوقت المستغرق
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-
-        st.info(f"⏱️ Time taken to create the table: {elapsed_time:.2f} seconds")
-
-        st.success(f"Timetable generated successfully with fitness score: {int(fitness*100)}%")
-        st.markdown("""
-        <style>
-        .schedule-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-            font-size: 14px;
-        }
-        .schedule-table th, .schedule-table td {
-            border: 1px solid #ccc;
-            padding: 8px;
-            text-align: center;
-            vertical-align: top;
-            min-width: 120px;
-        }
-        .schedule-table th {
-            background-color: #f0f0f0;
-        }
-        .slot {
-            font-weight: 500;
-            color: #333;
-        }
-        .slot span {
-            display: block;
-            margin-top: 4px;
-            color: #666;
-            font-size: 12px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
-        html = "<table class='schedule-table'>"
-        html += "<tr><th>Day / Time</th>" + "".join(f"<th>{t}</th>" for t in TIME_SLOTS) + "</tr>"
-
-        for day_index, day in enumerate(DAYS):
-            html += f"<tr><th>{day}</th>"
-            for time_slot in TIME_SLOTS:
-                slot_content = ""
-                for slot in saved.slots:
-                    slot_time = f"{slot.start_time.strftime('%H:%M')}-{slot.end_time.strftime('%H:%M')}"
-                    if slot.day_of_week == day_index and slot_time == time_slot:
-                        slot_content = f"""
-                            <div class='slot'>
-                                {slot.course.name}
-                                <span>{slot.teacher.name}</span>
-                                <span>{slot.classroom.name}</span>
-                            </div>
-                        """
-                        break
-                html += f"<td>{slot_content}</td>"
-            html += "</tr>"
-
-        html += "</table>"
-        st.markdown(html, unsafe_allow_html=True)
-
-
-        pdf = export_schedule_to_pdf(saved.id)
-        if pdf:
-            st.download_button("📄 Download Timetable PDF", data=pdf, file_name=f"{name}.pdf", mime="application/pdf")
+    pdf_download_button(saved.id, "📄 Download Timetable PDF", f"{job['name']}.pdf", f"pdf_{job['id']}")
@@ -0,0 +1,164 @@
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from db.database import session_scope
+from core.genetic_scheduler import GeneticScheduler
+
+# Concurrent generation runs shared by all browser sessions
+MAX_WORKERS = 4
+# Seconds a finished job stays listed for the page, e.g. after a browser refresh
+JOB_TTL = 60 * 60
+# Runs per job when timetables saved meanwhile by other jobs clash with its result
+MAX_ATTEMPTS = 3
+
+
+class GenerationJob:
+    """One background timetable generation and its latest progress snapshot"""
+    def __init__(self, job_id, year_id, name, settings, run_options, save_lock):
+        self.id = job_id
+        self.year_id = year_id
+        self.name = name
+        self.settings = settings
+        self.run_options = run_options
+        self.status = 'queued'
+        self.progress = {}
+        self.schedule_id = None
+        self.fitness = None
+        self.stop_reason = None
+        self.timings = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.lock = threading.Lock()
+        # Shared by all jobs so that checking a result against the saved timetables and saving it is atomic
+        self.save_lock = save_lock
+
+    def update_progress(self, info):
+        with self.lock:
+            self.progress = dict(info)
+
+    def snapshot(self):
+        """Consistent copy of the job state for rendering"""
+        with self.lock:
+            return {
+                'id': self.id,
+                'year_id': self.year_id,
+                'name': self.name,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'generations': self.settings['generations'],
+                'time_budget': self.run_options.get('time_budget'),
+                'schedule_id': self.schedule_id,
+                'fitness': self.fitness,
+                'stop_reason': self.stop_reason,
+                'timings': self.timings,
+                'error': self.error,
+                'elapsed': (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+            }
+
+    def run(self):
+        with self.lock:
+            self.status = 'running'
+            self.started_at = time.time()
+        try:
+            # Each job runs in its own thread and therefore gets its own session
+            with session_scope() as session:
+                scheduler = GeneticScheduler(session=session, academic_year_id=self.year_id, **self.settings)
+                for attempt in range(MAX_ATTEMPTS):
+                    result = scheduler.run(progress_callback=self.update_progress, **self.run_options)
+                    if result.best is None:
+                        # E.g. the time budget ran out before the first generation was scored
+                        with self.lock:
+                            self.stop_reason = result.stop_reason
+                            self.error = f"The run ended ({result.stop_reason}) before any timetable was scored"
+                            self.status = 'failed'
+                        return
+                    with self.save_lock:
+                        # Jobs for years sharing professors or rooms may have saved since this run loaded the conflicts
+                        scheduler.refresh_conflict_data()
+                        if scheduler.fitness_calculator.calculate_fitness(result.best) >= result.fitness:
+                            # Only the "revise" checkbox sets warm_start, and it also asks to replace the revised timetable
+                            replace = result.replaced if self.run_options.get('warm_start') else None
+                            saved = scheduler.save_schedule(result.best, name=self.name, fitness=result.fitness, replace_schedule_ids=replace)
+                            break
+                    # The next run starts from the fresh conflicts
+                else:
+                    with self.lock:
+                        self.stop_reason = result.stop_reason
+                        self.error = f"Timetables saved by other generation jobs kept clashing with the result ({MAX_ATTEMPTS} runs)"
+                        self.status = 'failed'
+                    return
+                with self.lock:
+                    self.schedule_id = saved.id
+                    self.fitness = result.fitness
+                    self.stop_reason = result.stop_reason
+                    # Read after saving so that save_schedule is included
+                    self.timings = scheduler.timer.report()
+                    self.status = 'done'
+        except Exception as e:
+            traceback.print_exc()
+            with self.lock:
+                self.error = str(e)
+                self.status = 'failed'
+        finally:
+            with self.lock:
+                self.finished_at = time.time()
+
+
+class GenerationJobManager:
+    """Thread pool running GenerationJobs outside the Streamlit script thread"""
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generation')
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+
+    def submit(self, year_id, name, settings, run_options):
+        with self.lock:
+            self._prune()
+            job = GenerationJob(next(self.ids), year_id, name, settings, run_options, self.save_lock)
+            self.jobs[job.id] = job
+        self.executor.submit(job.run)
+        return job.id
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def jobs_for_year(self, year_id):
+        """Jobs of the academic year in submission order, whichever browser session started them"""
+        with self.lock:
+            self._prune()
+            return [job for job in self.jobs.values() if job.year_id == year_id]
+
+    def is_running(self, year_id):
+        """True while a queued or running job targets the academic year"""
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return any(job.year_id == year_id and job.status in ('queued', 'running') for job in jobs)
+
+    def discard(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status in ('done', 'failed'):
+                del self.jobs[job_id]
+
+    def _prune(self):
+        """Forget finished jobs older than JOB_TTL; the caller holds self.lock"""
+        cutoff = time.time() - JOB_TTL
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+@st.cache_resource
+def get_job_manager():
+    """Process-wide job manager that survives reruns and page refreshes"""
+    return GenerationJobManager()
@@ -1,10 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
-from db.models import AcademicYear, Teacher, Course, Classroom, Schedule
-from db.database import get_engine, get_session
+from db.database import get_session
+from db.schedule_repository import get_schedules
+from app.reference_data import load_years, load_teachers, load_courses, load_classrooms
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
 
     st.title("📘 University Timetable System")
     st.markdown("""
@@ -27,14 +28,15 @@ def render():
     # Quick stats
     with st.container():
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("📆 Academic Years", session.query(AcademicYear).count())
-        col2.metric("👨‍🏫 Professors", session.query(Teacher).count())
-        col3.metric("📚 Courses", session.query(Course).count())
-        col4.metric("🏫 Classrooms", session.query(Classroom).count())
+        years = load_years()
+        col1.metric("📆 Academic Years", len(years))
+        col2.metric("👨‍🏫 Professors", len(load_teachers()))
+        col3.metric("📚 Courses", len(load_courses()))
+        col4.metric("🏫 Classrooms", len(load_classrooms()))
 
     st.markdown("---")
     st.subheader("🗂 Latest Created Schedules")
-    latest_schedules = session.query(Schedule).order_by(Schedule.id.desc()).limit(5).all()
+    latest_schedules = get_schedules(session, limit=5)
 
     if latest_schedules:
         for schedule in latest_schedules:
@@ -42,7 +44,7 @@ def render():
                 st.markdown(f"""
                     <div class="card">
                         <h4>{schedule.name}</h4>
-                        <p><strong>Academic Year:</strong> {schedule.academic_year.name}</p>
+                        <p><strong>Academic Year:</strong> {years[schedule.academic_year_id].name}</p>
                         <p><strong>Created:</strong> {schedule.created_at.strftime('%Y-%m-%d')}</p>
                         <p><strong>Fitness:</strong> {schedule.fitness_score}%</p>
                     </div>
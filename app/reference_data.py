@@ -0,0 +1,128 @@
+from typing import NamedTuple, Optional, Tuple
+from datetime import time
+
+import streamlit as st
+
+from db.models import AcademicYear, Teacher, TeacherAvailability, Course, Classroom, teacher_course, course_year, classroom_year
+from db.database import session_scope
+
+
+class YearRecord(NamedTuple):
+    id: int
+    name: str
+    description: Optional[str]
+    course_ids: Tuple[int, ...]
+    classroom_ids: Tuple[int, ...]
+
+
+class AvailabilityRecord(NamedTuple):
+    id: int
+    day_of_week: int
+    start_time: time
+    end_time: time
+    is_available: bool
+
+
+class TeacherRecord(NamedTuple):
+    id: int
+    name: str
+    email: Optional[str]
+    phone: Optional[str]
+    course_ids: Tuple[int, ...]
+    availabilities: Tuple[AvailabilityRecord, ...]
+
+
+class CourseRecord(NamedTuple):
+    id: int
+    name: str
+    code: Optional[str]
+    credit_hours: int
+    year_ids: Tuple[int, ...]
+    teacher_ids: Tuple[int, ...]
+
+
+class ClassroomRecord(NamedTuple):
+    id: int
+    name: str
+    capacity: Optional[int]
+    building: Optional[str]
+    year_ids: Tuple[int, ...]
+
+
+def _links(session, table, key, value):
+    """{key id: tuple of linked ids} for an association table, in id order"""
+    links = {}
+    for key_id, value_id in session.query(table.c[key], table.c[value]).order_by(table.c[key], table.c[value]):
+        links.setdefault(key_id, []).append(value_id)
+    return {key_id: tuple(value_ids) for key_id, value_ids in links.items()}
+
+
+# Each loader is cached process-wide and shared by all browser sessions; the
+# records are immutable, so pages can hold on to them without copying
+
+@st.cache_resource
+def load_years():
+    with session_scope() as session:
+        courses = _links(session, course_year, 'year_id', 'course_id')
+        classrooms = _links(session, classroom_year, 'year_id', 'classroom_id')
+        return {
+            year.id: YearRecord(year.id, year.name, year.description, courses.get(year.id, ()), classrooms.get(year.id, ()))
+            for year in session.query(AcademicYear).order_by(AcademicYear.id)
+        }
+
+
+@st.cache_resource
+def load_teachers():
+    with session_scope() as session:
+        courses = _links(session, teacher_course, 'teacher_id', 'course_id')
+        availabilities = {}
+        for a in session.query(TeacherAvailability).order_by(TeacherAvailability.teacher_id, TeacherAvailability.day_of_week, TeacherAvailability.start_time):
+            availabilities.setdefault(a.teacher_id, []).append(
+                AvailabilityRecord(a.id, a.day_of_week, a.start_time, a.end_time, bool(a.is_available))
+            )
+        return {
+            teacher.id: TeacherRecord(
+                teacher.id, teacher.name, teacher.email, teacher.phone,
+                courses.get(teacher.id, ()), tuple(availabilities.get(teacher.id, ()))
+            )
+            for teacher in session.query(Teacher).order_by(Teacher.id)
+        }
+
+
+@st.cache_resource
+def load_courses():
+    with session_scope() as session:
+        years = _links(session, course_year, 'course_id', 'year_id')
+        teachers = _links(session, teacher_course, 'course_id', 'teacher_id')
+        return {
+            course.id: CourseRecord(course.id, course.name, course.code, course.credit_hours, years.get(course.id, ()), teachers.get(course.id, ()))
+            for course in session.query(Course).order_by(Course.id)
+        }
+
+
+@st.cache_resource
+def load_classrooms():
+    with session_scope() as session:
+        years = _links(session, classroom_year, 'classroom_id', 'year_id')
+        return {
+            room.id: ClassroomRecord(room.id, room.name, room.capacity, room.building, years.get(room.id, ()))
+            for room in session.query(Classroom).order_by(Classroom.id)
+        }
+
+
+LOADERS = {
+    'years': load_years,
+    'teachers': load_teachers,
+    'courses': load_courses,
+    'classrooms': load_classrooms
+}
+
+
+def invalidate(*kinds):
+    """Drop the cached records of the given kinds after a committed write
+
+    Associations are stored on both sides, so a write to a link table must
+    name both kinds (e.g. 'teachers', 'courses' for teacher_course).
+    """
+    for kind in kinds:
+        LOADERS[kind].clear()
@@ -1,63 +1,62 @@
 import streamlit as st
 from datetime import time
 from db.models import Teacher, Course, TeacherAvailability
-from db.database import get_engine, get_session
+from db.database import get_session
+from app.reference_data import load_teachers, load_courses, invalidate
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("👨‍🏫 Professors Management")
+    courses = load_courses()
 
     with st.expander("➕ Add New Professor"):
         with st.form("add_teacher_form"):
             name = st.text_input("Full Name")
             email = st.text_input("Email")
             phone = st.text_input("Phone Number")
-            courses = session.query(Course).all()
-            selected_courses = st.multiselect("Select Courses", [c.id for c in courses], format_func=lambda id: session.query(Course).get(id).name)
+            selected_courses = st.multiselect("Select Courses", list(courses), format_func=lambda id: courses[id].name)
 
             submit = st.form_submit_button("Add")
             if submit and name:
                 teacher = Teacher(name=name, email=email, phone=phone)
-                for cid in selected_courses:
-                    course = session.query(Course).get(cid)
-                    if course:
-                        teacher.courses.append(course)
+                if selected_courses:
+                    teacher.courses = session.query(Course).filter(Course.id.in_(selected_courses)).all()
                 session.add(teacher)
                 session.commit()
+                invalidate('teachers', 'courses')
                 st.success("Professor added successfully!")
 
     
-    teachers = session.query(Teacher).all()
+    teachers = load_teachers()
     if not teachers:
         st.info("No professors found.")
         return
 
-    for teacher in teachers:
+    for teacher in teachers.values():
         with st.expander(f"👨‍🏫 {teacher.name}"):
             st.markdown(f"**Email:** {teacher.email or 'Not provided'}")
             st.markdown(f"**Phone:** {teacher.phone or 'Not provided'}")
 
-            if teacher.courses:
+            if teacher.course_ids:
                 st.markdown("**Courses:**")
-                for c in teacher.courses:
-                    st.markdown(f"- {c.name}")
+                for cid in teacher.course_ids:
+                    st.markdown(f"- {courses[cid].name}")
 
             col_del1, col_del2 = st.columns([1,3])
             with col_del1:
                 if st.button("🗑️ Delete Professor", key=f"delete_teacher_{teacher.id}"):
-                    if teacher.courses:
+                    if teacher.course_ids:
                         st.warning("you can't delete the teacher because he has courses")
                     else:
-                        availabilities = session.query(TeacherAvailability).filter_by(teacher_id=teacher.id).all()
-                        for a in availabilities:
-                            session.delete(a)
-                        session.delete(teacher)
+                        session.query(TeacherAvailability).filter_by(teacher_id=teacher.id).delete()
+                        session.delete(session.get(Teacher, teacher.id))
                         session.commit()
+                        invalidate('teachers')
                         st.success("the teacher deleted successfully")
                         st.rerun()
 
             st.markdown("**Availability:**")
-            availabilities = session.query(TeacherAvailability).filter_by(teacher_id=teacher.id).all()
+            availabilities = teacher.availabilities
             if availabilities:
                 day_map = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
                 grouped = {}
@@ -92,11 +91,13 @@ def render():
                                     submit_edit = st.form_submit_button("Update Availability")
                                     cancel_edit = st.form_submit_button("Cancel")
                                     if submit_edit:
-                                        a.day_of_week = day
-                                        a.start_time = time(start_hour, 0)
-                                        a.end_time = time(end_hour, 0)
-                                        a.is_available = is_available
+                                        availability = session.get(TeacherAvailability, a.id)
+                                        availability.day_of_week = day
+                                        availability.start_time = time(start_hour, 0)
+                                        availability.end_time = time(end_hour, 0)
+                                        availability.is_available = is_available
                                         session.commit()
+                                        invalidate('teachers')
                                         st.success("Availability updated successfully.")
                                         st.session_state[edit_key] = False
                                         st.rerun()
@@ -105,8 +106,9 @@ def render():
                                         st.rerun()
                         with col2:
                             if st.button(f"Delete {day_name} {a.start_time.strftime('%H:%M')}-{a.end_time.strftime('%H:%M')}", key=f"delete_{a.id}"):
-                                session.delete(a)
+                                session.query(TeacherAvailability).filter_by(id=a.id).delete()
                                 session.commit()
+                                invalidate('teachers')
                                 st.success("Availability deleted successfully.")
                                 st.rerun()
             else:
@@ -127,6 +129,7 @@ def render():
                         is_available=is_available
                     ))
                     session.commit()
+                    invalidate('teachers')
                     st.success("Availability added successfully.")
                     st.rerun()
         
@@ -134,16 +137,16 @@ def render():
                 new_name = st.text_input("Full Name", value=teacher.name)
                 new_email = st.text_input("Email", value=teacher.email or "")
                 new_phone = st.text_input("Phone", value=teacher.phone or "")
-                all_courses = session.query(Course).all()
-                selected = [c.id for c in teacher.courses]
-                course_ids = st.multiselect("Courses", [c.id for c in all_courses], default=selected, format_func=lambda id: session.query(Course).get(id).name)
+                course_ids = st.multiselect("Courses", list(courses), default=list(teacher.course_ids), format_func=lambda id: courses[id].name)
                 update_btn = st.form_submit_button("Update")
 
                 if update_btn and new_name:
-                    teacher.name = new_name
-                    teacher.email = new_email
-                    teacher.phone = new_phone
-                    teacher.courses = [session.query(Course).get(cid) for cid in course_ids]
+                    record = session.get(Teacher, teacher.id)
+                    record.name = new_name
+                    record.email = new_email
+                    record.phone = new_phone
+                    record.courses = session.query(Course).filter(Course.id.in_(course_ids)).all()
                     session.commit()
+                    invalidate('teachers', 'courses')
                     st.success("Professor updated successfully!")
                     st.rerun()
@@ -0,0 +1,106 @@
+import html
+from collections import namedtuple
+from functools import lru_cache
+
+from db.models import AcademicYear, Schedule, ScheduleSlot, Course, Teacher, Classroom
+
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+TIME_SLOTS = ["08:00-10:00", "10:00-12:00", "12:00-14:00", "14:00-16:00", "16:00-18:00"]
+
+# Everything a timetable shows; slots are (day_of_week, "HH:MM-HH:MM", course, teacher, classroom)
+ScheduleContent = namedtuple('ScheduleContent', ['name', 'year_name', 'fitness_score', 'slots'])
+GridEntry = namedtuple('GridEntry', ['course', 'teacher', 'classroom'])
+
+TABLE_CSS = """
+    <style>
+    .schedule-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 20px;
+        font-size: 14px;
+    }
+    .schedule-table th, .schedule-table td {
+        border: 1px solid #ccc;
+        padding: 8px;
+        text-align: center;
+        vertical-align: top;
+        min-width: 120px;
+    }
+    .schedule-table th {
+        background-color: #f0f0f0;
+    }
+    .slot {
+        font-weight: 500;
+        color: #333;
+    }
+    .slot + .slot {
+        margin-top: 8px;
+        padding-top: 8px;
+        border-top: 1px dashed #ccc;
+    }
+    .slot span {
+        display: block;
+        margin-top: 4px;
+        color: #666;
+        font-size: 12px;
+    }
+    </style>
+"""
+
+
+def load_schedule_content(session, schedule_id):
+    """The schedule's displayed content in two queries, or None if it does not exist"""
+    header = session.query(Schedule.name, AcademicYear.name, Schedule.fitness_score).join(
+        AcademicYear, Schedule.academic_year_id == AcademicYear.id
+    ).filter(Schedule.id == schedule_id).first()
+    if header is None:
+        return None
+
+    rows = session.query(
+        ScheduleSlot.day_of_week, ScheduleSlot.start_time, ScheduleSlot.end_time,
+        Course.name, Teacher.name, Classroom.name
+    ).join(Course, ScheduleSlot.course_id == Course.id).join(
+        Teacher, ScheduleSlot.teacher_id == Teacher.id
+    ).join(
+        Classroom, ScheduleSlot.classroom_id == Classroom.id
+    ).filter(ScheduleSlot.schedule_id == schedule_id).order_by(ScheduleSlot.id).all()
+
+    slots = tuple(
+        (day, f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}", course, teacher, classroom)
+        for day, start, end, course, teacher, classroom in rows
+    )
+    return ScheduleContent(header[0], header[1], header[2], slots)
+
+
+@lru_cache(maxsize=256)
+def build_grid(slots):
+    """{(day_index, time slot): (GridEntry, ...)} in one pass over ScheduleContent.slots
+
+    Cells holding parallel sections keep every entry, in slot order. Memoized on the
+    slots themselves, so a schedule's grid is rebuilt only after its content changes.
+    """
+    cells = {}
+    for day_index, time_key, course, teacher, classroom in slots:
+        cells.setdefault((day_index, time_key), []).append(GridEntry(course, teacher, classroom))
+    return {key: tuple(entries) for key, entries in cells.items()}
+
+
+@lru_cache(maxsize=256)
+def grid_html(slots):
+    """HTML day x time table of the slots, styled by TABLE_CSS"""
+    cells = build_grid(slots)
+    parts = ["<table class='schedule-table'>"]
+    parts.append("<tr><th>Day / Time</th>" + "".join(f"<th>{t}</th>" for t in TIME_SLOTS) + "</tr>")
+    for day_index, day in enumerate(DAYS):
+        parts.append(f"<tr><th>{day}</th>")
+        for time_slot in TIME_SLOTS:
+            entries = "".join(
+                f"<div class='slot'>{html.escape(entry.course)}"
+                f"<span>{html.escape(entry.teacher)}</span>"
+                f"<span>{html.escape(entry.classroom)}</span></div>"
+                for entry in cells.get((day_index, time_slot), ())
+            )
+            parts.append(f"<td>{entries}</td>")
+        parts.append("</tr>")
+    parts.append("</table>")
+    return "".join(parts)
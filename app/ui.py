@@ -1,5 +1,6 @@
 import streamlit as st
 from app import home, years, teachers, courses, classrooms, generate, view_schedules
+from db.database import session_scope
 
 def main():
     st.set_page_config(page_title="University Timetable System", page_icon="📚", layout="wide")
@@ -20,4 +21,6 @@ def main():
             st.session_state.page = page_name
 
     selected = st.session_state.get("page", "Home")
-    PAGES[selected].render()
+    # One session per script run, closed when the page has rendered
+    with session_scope():
+        PAGES[selected].render()
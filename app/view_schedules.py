@@ -1,14 +1,20 @@
 import streamlit as st
 import pandas as pd
-from db.models import AcademicYear, Schedule
-from db.database import get_engine, get_session
-from app.export import export_schedule_to_pdf
+from io import BytesIO
+from db.models import AcademicYear
+from db.database import get_session
+from db.schedule_repository import get_schedule, get_schedules
+from app.export import pdf_download_button
+from app.batch_export import VARIANTS, export_timetables
+from app.timetable_grid import DAYS, TABLE_CSS, grid_html, load_schedule_content
+from core.genetic_scheduler import GeneticScheduler
 
-DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
-TIME_SLOTS = ["08:00-10:00", "10:00-12:00", "12:00-14:00", "14:00-16:00", "16:00-18:00"]
+# st.download_button keeps the whole file in memory, so exports built on this page
+# are capped; larger selections go through python -m app.batch_export
+MAX_PAGE_DOCUMENTS = 500
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("📅 View Timetables")
 
     years = session.query(AcademicYear).all()
@@ -17,15 +23,14 @@ def render():
 
     selected_year = st.selectbox("Select Academic Year", options=year_options.keys(), format_func=lambda x: year_options[x])
 
-    if selected_year == -1:
-        schedules = session.query(Schedule).order_by(Schedule.id.desc()).all()
-    else:
-        schedules = session.query(Schedule).filter_by(academic_year_id=selected_year).order_by(Schedule.id.desc()).all()
+    schedules = get_schedules(session, year_id=None if selected_year == -1 else selected_year)
 
     if not schedules:
         st.info("No timetables available.")
         return
 
+    render_batch_export([s.id for s in schedules])
+
     selected_id = None
     if "selected_schedule" in st.session_state:
         selected_id = st.session_state.selected_schedule
@@ -34,74 +39,81 @@ def render():
         options = {s.id: f"{s.name} ({s.academic_year.name})" for s in schedules}
         selected_id = st.selectbox("Select Timetable", options=options.keys(), format_func=lambda x: options[x])
 
-    schedule = session.query(Schedule).get(selected_id)
+    schedule = get_schedule(session, selected_id, with_slots=False)
 
     st.subheader(schedule.name)
     st.markdown(f"**Academic Year:** {schedule.academic_year.name}")
     st.markdown(f"**Fitness Score:** {schedule.fitness_score}%")
 
-        
-    st.markdown("""
-        <style>
-        .schedule-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-            font-size: 14px;
-        }
-        .schedule-table th, .schedule-table td {
-            border: 1px solid #ccc;
-            padding: 8px;
-            text-align: center;
-            vertical-align: top;
-            min-width: 120px;
-        }
-        .schedule-table th {
-            background-color: #f0f0f0;
-        }
-        .slot {
-            font-weight: 500;
-            color: #333;
-        }
-        .slot span {
-            display: block;
-            margin-top: 4px;
-            color: #666;
-            font-size: 12px;
+    report = st.session_state.pop("repair_report", None)
+    if report and report['schedule_id'] == schedule.id:
+        render_repair_report(report)
+
+    content = load_schedule_content(session, schedule.id)
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+    st.markdown(grid_html(content.slots), unsafe_allow_html=True)
+
+    pdf_download_button(schedule.id, "📄 Download PDF", f"{schedule.name}.pdf", f"pdf_{schedule.id}")
+
+    if st.button("🔧 Repair Timetable", help="Move only the sessions that changed professors, rooms, courses or availability made invalid"):
+        result = GeneticScheduler(session, schedule.academic_year_id).repair_schedule(schedule.id)
+        st.session_state.repair_report = {
+            'schedule_id': schedule.id,
+            'changes': [
+                {'Course': change['course'], 'Change': kind, 'Before': describe_slot(change['before']), 'After': describe_slot(change['after'])}
+                for kind, changes in (('Moved', result.moved), ('Added', result.added), ('Removed', result.removed))
+                for change in changes
+            ],
+            'unresolved': result.unresolved,
+            'seconds': result.seconds
         }
-        </style>
-    """, unsafe_allow_html=True)
-
-    html = "<table class='schedule-table'>"
-    html += "<tr><th>Day / Time</th>" + "".join(f"<th>{t}</th>" for t in TIME_SLOTS) + "</tr>"
-
-    for day_index, day in enumerate(DAYS):
-        html += f"<tr><th>{day}</th>"
-        for time_slot in TIME_SLOTS:
-            slot_content = ""
-            for slot in schedule.slots:
-                slot_time = f"{slot.start_time.strftime('%H:%M')}-{slot.end_time.strftime('%H:%M')}"
-                if slot.day_of_week == day_index and slot_time == time_slot:
-                    slot_content = f"""
-                        <div class='slot'>
-                            {slot.course.name}
-                            <span>{slot.teacher.name}</span>
-                            <span>{slot.classroom.name}</span>
-                        </div>
-                    """
-                    break
-            html += f"<td>{slot_content}</td>"
-        html += "</tr>"
-
-    html += "</table>"
-    st.markdown(html, unsafe_allow_html=True)
-
-    pdf = export_schedule_to_pdf(schedule.id)
-    if pdf:
-        st.download_button("📄 Download PDF", data=pdf, file_name=f"{schedule.name}.pdf", mime="application/pdf")
+        st.session_state.selected_schedule = schedule.id
+        st.rerun()
 
     if st.button("🗑 Delete Timetable", type="primary"):
         session.delete(schedule)
         session.commit()
         st.success("Timetable deleted successfully.")
         st.rerun()
+
+
+def render_batch_export(schedule_ids):
+    """Export every listed timetable, and optionally per-professor and per-room timetables, at once"""
+    with st.expander("📦 Export All Listed Timetables"):
+        labels = {'schedule': "Timetables", 'teacher': "Per professor", 'classroom': "Per room"}
+        variants = st.multiselect("Include", VARIANTS, default=['schedule'], format_func=lambda v: labels[v])
+        output_format = st.radio("Format", ['zip', 'pdf'], format_func=lambda f: "ZIP of PDFs" if f == 'zip' else "Single PDF", horizontal=True)
+        if st.button("Build Export", disabled=not variants):
+            buffer = BytesIO()
+            try:
+                with st.spinner("Rendering timetables..."):
+                    count = export_timetables(
+                        buffer, schedule_ids=schedule_ids, variants=variants,
+                        output_format=output_format, max_documents=MAX_PAGE_DOCUMENTS
+                    )
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.download_button(
+                f"⬇️ Download {count} timetables",
+                data=buffer.getvalue(),
+                file_name=f"timetables.{output_format}",
+                mime="application/zip" if output_format == 'zip' else "application/pdf"
+            )
+
+
+def describe_slot(slot):
+    if slot is None:
+        return ""
+    teacher, day, start_time, end_time, classroom = slot
+    return f"{DAYS[day]} {start_time.strftime('%H:%M')}-{end_time.strftime('%H:%M')}, {teacher}, {classroom}"
+
+
+def render_repair_report(report):
+    if not report['changes']:
+        st.success(f"Nothing to repair: every session is still valid (checked in {report['seconds'] * 1000:.0f} ms).")
+    else:
+        st.success(f"Repaired in {report['seconds'] * 1000:.0f} ms; {len(report['changes'])} session(s) changed, the rest stayed in place.")
+        st.dataframe(pd.DataFrame(report['changes']), hide_index=True)
+    if report['unresolved']:
+        st.warning("Could not find a conflict-free place (or any professor or room) for: " + ", ".join(report['unresolved']))
@@ -1,10 +1,11 @@
 
 import streamlit as st
 from db.models import AcademicYear
-from db.database import get_engine, get_session
+from db.database import get_session
+from app.reference_data import load_years, invalidate
 
 def render():
-    session = get_session(get_engine())
+    session = get_session()
     st.title("📅 Academic Years Management")
 
     st.markdown("""
@@ -26,15 +27,16 @@ def render():
                 new_year = AcademicYear(name=year_name, description=year_description)
                 session.add(new_year)
                 session.commit()
+                invalidate('years')
                 st.success(f"Academic year '{year_name}' added successfully!")
 
-    years = session.query(AcademicYear).all()
+    years = load_years()
     if years:
-        for year in years:
+        for year in years.values():
             with st.expander(f"📘 {year.name}"):
                 st.markdown(f"**Description:** {year.description or 'No description'}")
-                st.markdown(f"**Courses Count:** {len(year.courses)}")
-                st.markdown(f"**Linked Classrooms:** {len(year.classrooms)}")
+                st.markdown(f"**Courses Count:** {len(year.course_ids)}")
+                st.markdown(f"**Linked Classrooms:** {len(year.classroom_ids)}")
 
                 with st.form(f"edit_year_{year.id}"):
                     edit_name = st.text_input("Academic Year Name", value=year.name)
@@ -47,24 +49,28 @@ def render():
                         delete_button = st.form_submit_button("Delete", type="primary")
 
                     if update_button and edit_name:
-                        year.name = edit_name
-                        year.description = edit_description
+                        record = session.get(AcademicYear, year.id)
+                        record.name = edit_name
+                        record.description = edit_description
                         session.commit()
+                        invalidate('years')
                         st.success("Academic year updated successfully!")
                         st.rerun()
 
                     if delete_button:
+                        record = session.get(AcademicYear, year.id)
                         # Delete all schedules linked to the year (cascade deletes slots)
-                        for schedule in year.schedules:
+                        for schedule in record.schedules:
                             session.delete(schedule)
                         # Delete all courses linked to the year
-                        for course in year.courses:
+                        for course in record.courses:
                             session.delete(course)
                         # Clear classrooms association
-                        year.classrooms.clear()
+                        record.classrooms.clear()
                         # Delete the year itself
-                        session.delete(year)
+                        session.delete(record)
                         session.commit()
+                        invalidate('years', 'courses', 'teachers', 'classrooms')
                         st.success("Academic year and all related data deleted successfully!")
                         st.rerun()
     else:
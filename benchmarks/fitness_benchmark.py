@@ -0,0 +1,106 @@
+"""Scoring throughput of GA children with the vectorized and incremental fitness modes
+
+    python -m benchmarks.fitness_benchmark --scale M L XL --mutation-rate 0.01 0.1 --output fitness_results.json
+"""
+import argparse
+import json
+import platform
+import random
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from core.genetic_scheduler import GeneticScheduler
+from benchmarks.synthetic import SCALES, create_instance
+from benchmarks.ga_benchmark import git_commit
+
+
+def score(fitness_calculator, children, incremental):
+    """Seconds to score children without the cache, and their fitnesses"""
+    fitness_calculator.vectorized = not incremental
+    fitness_calculator.incremental = incremental
+    started = perf_counter()
+    fitnesses = fitness_calculator.score_population(children)
+    return perf_counter() - started, fitnesses
+
+
+def run_benchmark(scale, seed=0, mutation_rates=(0.01, 0.1), population_size=50, batches=100):
+    """Score batches of mutation-only and crossover children of one scored population in both modes"""
+    instance = create_instance(scale, seed)
+    random.seed(seed)
+    scheduler = GeneticScheduler(instance.session, instance.target_year_ids, population_size=population_size)
+    fitness_calculator = scheduler.fitness_calculator
+    fitness_calculator.build_penalty_tables()
+    generator = scheduler.individual_generator
+    parents = [generator.generate_individual() for _ in range(population_size)]
+    score(fitness_calculator, parents, incremental=True)
+
+    def crossover_children():
+        pairs = zip(parents[::2], parents[1::2])
+        return [child for parent1, parent2 in pairs for child in scheduler.genetic_operations.crossover(parent1, parent2)]
+
+    kinds = [(f"mutation {rate}", lambda rate=rate: [generator.mutate(parent, rate) for parent in parents]) for rate in mutation_rates]
+    kinds.append(("crossover", crossover_children))
+    results = []
+    for kind, make_children in kinds:
+        seconds = {'vectorized': 0.0, 'incremental': 0.0}
+        n_children = 0
+        for _ in range(batches):
+            children = make_children()
+            vectorized_time, expected = score(fitness_calculator, children, incremental=False)
+            incremental_time, fitnesses = score(fitness_calculator, children, incremental=True)
+            if fitnesses != expected:
+                raise AssertionError(f"Incremental and vectorized fitness differ for {kind} children")
+            seconds['vectorized'] += vectorized_time
+            seconds['incremental'] += incremental_time
+            n_children += len(children)
+        results.append({
+            'scale': scale,
+            'seed': seed,
+            'children': kind,
+            'genome_rows': len(scheduler.codec.courses),
+            'population_size': population_size,
+            'scored': n_children,
+            'vectorized_per_second': n_children / seconds['vectorized'],
+            'incremental_per_second': n_children / seconds['incremental'],
+            'speedup': seconds['vectorized'] / seconds['incremental']
+        })
+    instance.session.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=['M', 'L', 'XL'])
+    parser.add_argument('--seed', type=int, nargs='+', default=[0])
+    parser.add_argument('--mutation-rate', type=float, nargs='+', default=[0.01, 0.1])
+    parser.add_argument('--population', type=int, default=50)
+    parser.add_argument('--batches', type=int, default=100, help="children batches scored per kind")
+    parser.add_argument('--output', default='fitness_results.json', help="JSON file to write")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scale:
+        for seed in args.seed:
+            for result in run_benchmark(scale, seed, args.mutation_rate, args.population, args.batches):
+                print(
+                    f"{scale:>2} seed={seed} {result['children']:<15} vectorized {result['vectorized_per_second']:9.0f}/s "
+                    f"incremental {result['incremental_per_second']:9.0f}/s speedup {result['speedup']:.2f}x"
+                )
+                results.append(result)
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} result(s) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""End-to-end GeneticScheduler benchmark on synthetic instances
+
+    python -m benchmarks.ga_benchmark --scale S M --mode vectorized --output results.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from core.genetic_scheduler import GeneticScheduler
+from benchmarks.synthetic import SCALES, create_instance
+
+MODES = ('scalar', 'vectorized', 'incremental')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(scale, seed=0, mode='vectorized', population_size=50, generations=100, mutation_rate=0.1,
+                  elite_size=2, target_fitness=0.5, time_budget=None, workers=1, joint_years=None, timing=False):
+    """Generate the instance, run the GA once and return its measurements"""
+    started = perf_counter()
+    instance = create_instance(scale, seed)
+    setup_time = perf_counter() - started
+    year_ids = instance.target_year_ids[:joint_years] if joint_years else instance.target_year_ids
+
+    random.seed(seed)
+    np.random.seed(seed)
+    started = perf_counter()
+    scheduler = GeneticScheduler(
+        instance.session, year_ids, population_size=population_size, generations=generations,
+        mutation_rate=mutation_rate, elite_size=elite_size, workers=workers, timing=timing
+    )
+    load_time = perf_counter() - started
+
+    trace = {'generations': 0, 'time_to_target': None, 'cache': {}}
+
+    def on_progress(info):
+        trace['generations'] = info['generation'] + 1
+        trace['cache'] = {key: info[key] for key in ('cache_hits', 'cache_misses', 'cache_size')}
+        if trace['time_to_target'] is None and info['best_fitness'] >= target_fitness:
+            trace['time_to_target'] = info['elapsed']
+
+    started = perf_counter()
+    result = scheduler.run(
+        progress_callback=on_progress,
+        vectorized=mode == 'vectorized',
+        incremental=mode == 'incremental',
+        time_budget=time_budget
+    )
+    run_time = perf_counter() - started
+    instance.session.close()
+
+    # Every generation ranks the whole population once
+    evaluations = trace['generations'] * population_size
+    return {
+        'scale': scale,
+        'seed': seed,
+        'mode': mode,
+        'workers': workers,
+        'instance': instance.counts,
+        'scheduled_years': len(year_ids),
+        'genome_rows': len(scheduler.codec.courses),
+        'population_size': population_size,
+        'generations': trace['generations'],
+        'stop_reason': result.stop_reason,
+        'setup_seconds': setup_time,
+        'load_seconds': load_time,
+        'run_seconds': run_time,
+        'evaluations': evaluations,
+        'fitness_computations': trace['cache'].get('cache_misses', 0),
+        'evaluations_per_second': evaluations / run_time if run_time else None,
+        'generations_per_second': trace['generations'] / run_time if run_time else None,
+        'target_fitness': target_fitness,
+        'time_to_target': trace['time_to_target'],
+        'final_fitness': result.fitness,
+        'timings': result.timings,
+        **trace['cache']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=['S', 'M'])
+    parser.add_argument('--seed', type=int, nargs='+', default=[0])
+    parser.add_argument('--mode', nargs='+', choices=MODES, default=['vectorized'])
+    parser.add_argument('--population', type=int, default=50)
+    parser.add_argument('--generations', type=int, default=100)
+    parser.add_argument('--mutation-rate', type=float, default=0.1)
+    parser.add_argument('--elite-size', type=int, default=2)
+    parser.add_argument('--target-fitness', type=float, default=0.5)
+    parser.add_argument('--time-budget', type=float, default=None, help="seconds per run")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--joint-years', type=int, default=None, help="override the scale's jointly scheduled years")
+    parser.add_argument('--timing', action='store_true', help="record per-phase timings")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file to write")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scale:
+        for seed in args.seed:
+            for mode in args.mode:
+                result = run_benchmark(
+                    scale, seed, mode, args.population, args.generations, args.mutation_rate,
+                    args.elite_size, args.target_fitness, args.time_budget, args.workers, args.joint_years, args.timing
+                )
+                time_to_target = result['time_to_target']
+                print(
+                    f"{scale:>2} seed={seed} {mode:<11} {result['evaluations_per_second']:10.0f} evals/s "
+                    f"{result['generations_per_second']:8.2f} gen/s fitness={result['final_fitness']:.4f} "
+                    f"time to target={'-' if time_to_target is None else f'{time_to_target:.3f}s'}"
+                )
+                results.append(result)
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} result(s) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Concurrent simulated users against the shared engine, session-per-request vs one shared session
+
+    python -m benchmarks.load_test --users 1 8 32 --requests 200 --output load_results.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+from datetime import datetime, time
+from time import perf_counter
+
+from sqlalchemy.orm import sessionmaker
+
+from db.database import configure_engine, create_tables, get_engine, session_scope
+from db.schedule_repository import get_schedule
+from db.models import AcademicYear, Teacher, TeacherAvailability, Course, Classroom, Schedule
+from benchmarks.synthetic import generate_instance
+from benchmarks.ga_benchmark import git_commit
+
+MODES = ('scoped', 'shared')
+
+
+def page_request(session, rng):
+    """One simulated page render; roughly one in ten also writes"""
+    session.query(AcademicYear).count()
+    session.query(Teacher).count()
+    session.query(Course).count()
+    session.query(Classroom).count()
+    teacher = session.get(Teacher, rng.choice(page_request.teacher_ids))
+    [(a.day_of_week, a.start_time) for a in teacher.availabilities]
+    schedule = get_schedule(session, rng.choice(page_request.schedule_ids))
+    [(slot.course.name, slot.teacher.name, slot.classroom.name) for slot in schedule.slots]
+    if rng.random() < 0.1:
+        availability = TeacherAvailability(teacher_id=teacher.id, day_of_week=rng.randrange(5), start_time=time(8), end_time=time(10), is_available=True)
+        session.add(availability)
+        session.commit()
+        session.delete(availability)
+        session.commit()
+
+
+def run_users(mode, users, requests, seed=0):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    shared = sessionmaker(bind=get_engine())() if mode == 'shared' else None
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(requests):
+            started = perf_counter()
+            try:
+                if shared is not None:
+                    # The old module-global session: every user queues behind it
+                    with lock:
+                        page_request(shared, rng)
+                else:
+                    with session_scope() as session:
+                        page_request(session, rng)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                if shared is not None:
+                    shared.rollback()
+            elapsed = (perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=user, args=(index,)) for index in range(users)]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = perf_counter() - started
+    if shared is not None:
+        shared.close()
+
+    latencies.sort()
+    return {
+        'mode': mode,
+        'users': users,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_types': sorted(set(errors)),
+        'wall_seconds': wall,
+        'requests_per_second': len(latencies) / wall if wall else None,
+        'median_ms': statistics.median(latencies),
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+        'max_ms': latencies[-1]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=100, help="requests per user")
+    parser.add_argument('--mode', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--scale', default='M')
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--max-overflow', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_results.json')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        configure_engine(
+            f"sqlite:///{os.path.join(directory, 'load.db')}",
+            pool_size=args.pool_size,
+            max_overflow=args.max_overflow
+        )
+        create_tables()
+        with session_scope() as session:
+            generate_instance(session, args.scale, args.seed)
+            page_request.teacher_ids = [teacher_id for (teacher_id,) in session.query(Teacher.id)]
+            page_request.schedule_ids = [schedule_id for (schedule_id,) in session.query(Schedule.id)]
+
+        for users in args.users:
+            for mode in args.mode:
+                result = run_users(mode, users, args.requests, args.seed)
+                print(
+                    f"{mode:<7} {users:>3} users {result['requests_per_second']:8.1f} req/s "
+                    f"median {result['median_ms']:7.2f} ms p95 {result['p95_ms']:7.2f} ms errors {result['errors']}"
+                )
+                results.append(result)
+        get_engine().dispose()
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'scale': args.scale,
+        'pool_size': args.pool_size,
+        'max_overflow': args.max_overflow,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
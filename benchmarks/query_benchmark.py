@@ -0,0 +1,158 @@
+"""Conflict and availability query latency with and without indexes and SQLite pragmas
+
+    python -m benchmarks.query_benchmark --slots 100000 --output query_results.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from db.database import set_sqlite_pragmas
+from db.models import Base, AcademicYear, Teacher, TeacherAvailability, Schedule, ScheduleSlot
+from benchmarks.synthetic import TIME_SLOTS, DAYS, generate_instance
+from benchmarks.ga_benchmark import git_commit
+
+INDEXED_TABLES = (ScheduleSlot.__table__, TeacherAvailability.__table__)
+
+
+def fill_slots(session, n_slots, seed=0, slots_per_schedule=20):
+    """Top the database up to n_slots schedule slots spread over generated schedules"""
+    rng = random.Random(seed)
+    year_ids = [year_id for (year_id,) in session.query(AcademicYear.id)]
+    teacher_ids = [teacher_id for (teacher_id,) in session.query(Teacher.id)]
+    existing = session.query(ScheduleSlot).count()
+    remaining = max(0, n_slots - existing)
+    n_schedules = -(-remaining // slots_per_schedule)
+    schedule_ids = session.execute(
+        insert(Schedule).returning(Schedule.id),
+        [{'name': f"Bulk {i}", 'academic_year_id': rng.choice(year_ids), 'fitness_score': 0} for i in range(n_schedules)]
+    ).scalars().all()
+    course_ids = [course_id for (course_id,) in session.execute(select(ScheduleSlot.course_id).distinct())] or [1]
+    classroom_ids = [classroom_id for (classroom_id,) in session.execute(select(ScheduleSlot.classroom_id).distinct())] or [1]
+    rows = []
+    for i in range(remaining):
+        start_time, end_time = rng.choice(TIME_SLOTS)
+        rows.append({
+            'schedule_id': schedule_ids[i // slots_per_schedule],
+            'course_id': rng.choice(course_ids),
+            'teacher_id': rng.choice(teacher_ids),
+            'classroom_id': rng.choice(classroom_ids),
+            'day_of_week': rng.choice(DAYS),
+            'start_time': start_time,
+            'end_time': end_time
+        })
+    if rows:
+        session.execute(insert(ScheduleSlot), rows)
+    session.commit()
+
+
+def timed(query, arguments):
+    """Latency in ms of query(*args) for every args tuple"""
+    samples = []
+    for args in arguments:
+        started = perf_counter()
+        query(*args)
+        samples.append((perf_counter() - started) * 1000)
+    return {
+        'runs': len(samples),
+        'mean_ms': statistics.fmean(samples),
+        'median_ms': statistics.median(samples),
+        'p95_ms': sorted(samples)[int(len(samples) * 0.95) - 1],
+        'max_ms': max(samples)
+    }
+
+
+def measure(db_url, pragmas, lookups, seed=0):
+    engine = create_engine(db_url, echo=False, future=True)
+    if pragmas:
+        event.listen(engine, 'connect', set_sqlite_pragmas)
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(seed)
+    teacher_ids = [teacher_id for (teacher_id,) in session.query(Teacher.id)]
+
+    def slot_conflicts(teacher_id, day, start_time, end_time):
+        return session.query(ScheduleSlot.id).filter(
+            ScheduleSlot.teacher_id == teacher_id,
+            ScheduleSlot.day_of_week == day,
+            ScheduleSlot.start_time == start_time,
+            ScheduleSlot.end_time == end_time
+        ).all()
+
+    def availability(teacher_id, day):
+        return session.query(TeacherAvailability).filter_by(teacher_id=teacher_id, day_of_week=day, is_available=True).all()
+
+    def booked_slots(year_teacher_ids):
+        return session.query(
+            ScheduleSlot.teacher_id, ScheduleSlot.day_of_week, ScheduleSlot.start_time, ScheduleSlot.end_time
+        ).join(Schedule).filter(ScheduleSlot.teacher_id.in_(year_teacher_ids)).distinct().all()
+
+    slot_arguments = [(rng.choice(teacher_ids), rng.choice(DAYS), *rng.choice(TIME_SLOTS)) for _ in range(lookups)]
+    availability_arguments = [(rng.choice(teacher_ids), rng.choice(DAYS)) for _ in range(lookups)]
+    booked_arguments = [(rng.sample(teacher_ids, min(30, len(teacher_ids))),) for _ in range(max(1, lookups // 25))]
+    try:
+        return {
+            'slot_conflict_lookup': timed(slot_conflicts, slot_arguments),
+            'availability_lookup': timed(availability, availability_arguments),
+            'booked_slots_load': timed(booked_slots, booked_arguments)
+        }
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slots', type=int, default=100000)
+    parser.add_argument('--scale', default='L', help="synthetic instance providing years, teachers and availability")
+    parser.add_argument('--lookups', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='query_results.json')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_engine(db_url, echo=False, future=True)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        generate_instance(session, args.scale, args.seed)
+        fill_slots(session, args.slots, args.seed)
+        session.close()
+
+        results = {}
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.drop(engine)
+        results['no_indexes'] = measure(db_url, False, args.lookups, args.seed)
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.create(engine)
+        results['indexes'] = measure(db_url, False, args.lookups, args.seed)
+        engine.dispose()
+        # Last, since journal_mode=WAL persists in the database file
+        results['indexes_and_pragmas'] = measure(db_url, True, args.lookups, args.seed)
+
+    for config, queries in results.items():
+        for query, stats in queries.items():
+            print(f"{config:<20} {query:<22} median {stats['median_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms")
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'slots': args.slots,
+        'scale': args.scale,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
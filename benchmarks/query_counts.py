@@ -0,0 +1,73 @@
+"""Check that reading saved schedules issues a constant number of SQL queries
+
+    python -m benchmarks.query_counts
+
+Every read runs against a small and a larger synthetic instance; the run fails when
+a read exceeds its budget or issues more queries on the larger instance (an N+1).
+"""
+import argparse
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from db.schedule_repository import get_schedule, get_schedules, get_all_slots
+from app.timetable_grid import load_schedule_content
+from benchmarks.synthetic import create_instance
+
+
+def _touch_slots(schedules):
+    for schedule in schedules:
+        schedule.academic_year.name
+        for slot in schedule.slots:
+            slot.course.name, slot.teacher.name, slot.classroom.name
+
+
+# name: (budget, read and touch everything a page or check uses)
+READS = {
+    'schedule_with_slots': (2, lambda session, ids: _touch_slots([get_schedule(session, ids[0])])),
+    'schedule_header': (1, lambda session, ids: get_schedule(session, ids[0], with_slots=False).academic_year.name),
+    'schedule_list': (1, lambda session, ids: [s.academic_year.name for s in get_schedules(session)]),
+    'latest_schedules': (1, lambda session, ids: [s.academic_year.name for s in get_schedules(session, limit=5)]),
+    'schedules_with_slots': (2, lambda session, ids: _touch_slots(get_schedules(session, ids, with_slots=True))),
+    'all_slots_for_conflicts': (1, lambda session, ids: [(s.schedule.name, s.schedule.academic_year_id, s.course.name) for s in get_all_slots(session)]),
+    'schedule_content': (2, lambda session, ids: load_schedule_content(session, ids[0])),
+}
+
+
+def count_queries(scale, seed=0):
+    """{read name: number of statements executed} on a fresh session per read"""
+    instance = create_instance(scale, seed)
+    engine = instance.session.get_bind()
+    schedule_ids = [schedule.id for schedule in get_schedules(instance.session)]
+    instance.session.close()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    counts = {}
+    for name, (_, read) in READS.items():
+        session = sessionmaker(bind=engine)()
+        statements.clear()
+        read(session, schedule_ids)
+        counts[name] = len(statements)
+        session.close()
+    engine.dispose()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs=2, default=['S', 'M'], help="small and large instance scales")
+    args = parser.parse_args(argv)
+
+    small, large = (count_queries(scale) for scale in args.scales)
+    failures = 0
+    for name, (budget, _) in READS.items():
+        ok = small[name] <= budget and large[name] == small[name]
+        failures += not ok
+        print(f"{name:<26} {args.scales[0]}: {small[name]:>3}  {args.scales[1]}: {large[name]:>3}  budget {budget}  {'ok' if ok else 'FAIL'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
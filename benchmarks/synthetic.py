@@ -0,0 +1,112 @@
+import random
+from collections import namedtuple
+from datetime import date, time
+
+from sqlalchemy.orm import sessionmaker
+
+from db.database import create_db_engine
+from db.models import (
+    Base, AcademicYear, Teacher, TeacherAvailability, Course, Classroom, Schedule, ScheduleSlot
+)
+
+# years: academic years, courses_per_year: courses of each year, teachers/classrooms:
+# shared pools, classrooms_per_year: rooms linked to each year, scheduled_years: years
+# that already have a saved timetable, joint_years: years the benchmark schedules jointly
+Scale = namedtuple('Scale', [
+    'years', 'courses_per_year', 'teachers', 'classrooms', 'classrooms_per_year', 'scheduled_years', 'joint_years'
+])
+
+SCALES = {
+    'S': Scale(3, 8, 12, 6, 3, 1, 1),
+    'M': Scale(12, 12, 60, 20, 4, 6, 2),
+    'L': Scale(50, 16, 250, 70, 5, 30, 4),
+    'XL': Scale(150, 20, 800, 200, 6, 100, 8),
+}
+
+TIME_SLOTS = [(time(hour, 0), time(hour + 2, 0)) for hour in range(8, 18, 2)]
+DAYS = range(5)
+
+Instance = namedtuple('Instance', ['session', 'scale', 'seed', 'target_year_ids', 'counts'])
+
+
+def generate_instance(session, scale, seed=0):
+    """Fill session's database with a reproducible synthetic problem of the given scale
+
+    Returns the ids of the years left without a timetable, in creation order.
+    """
+    if isinstance(scale, str):
+        scale = SCALES[scale]
+    rng = random.Random(seed)
+
+    years = [AcademicYear(name=f"Year {i + 1}") for i in range(scale.years)]
+    teachers = [Teacher(name=f"Teacher {i + 1}") for i in range(scale.teachers)]
+    classrooms = [
+        Classroom(name=f"Room {i + 1}", capacity=rng.choice([30, 40, 60, 120]), building=f"Building {i % 5 + 1}")
+        for i in range(scale.classrooms)
+    ]
+    session.add_all(years + teachers + classrooms)
+
+    for teacher in teachers:
+        for day in DAYS:
+            if rng.random() < 0.2:
+                continue
+            # One or two availability windows, occasionally an explicit unavailable block
+            start = rng.randrange(8, 14, 2)
+            end = rng.randrange(start + 2, 19, 2)
+            session.add(TeacherAvailability(teacher=teacher, day_of_week=day, start_time=time(start), end_time=time(end), is_available=True))
+            if end <= 14 and rng.random() < 0.5:
+                session.add(TeacherAvailability(teacher=teacher, day_of_week=day, start_time=time(end + 2), end_time=time(18), is_available=True))
+            if rng.random() < 0.1:
+                session.add(TeacherAvailability(teacher=teacher, day_of_week=day, start_time=time(start), end_time=time(start + 2), is_available=False))
+
+    year_courses = []
+    for index, year in enumerate(years):
+        year.classrooms = rng.sample(classrooms, min(scale.classrooms_per_year, len(classrooms)))
+        courses = [
+            Course(
+                name=f"Course {index + 1}.{i + 1}",
+                code=f"C{index + 1:03d}{i + 1:02d}",
+                academic_years=[year],
+                teachers=rng.sample(teachers, rng.randint(1, min(3, len(teachers))))
+            )
+            for i in range(scale.courses_per_year)
+        ]
+        session.add_all(courses)
+        year_courses.append(courses)
+    session.flush()
+
+    for year, courses in zip(years[:scale.scheduled_years], year_courses):
+        schedule = Schedule(name=f"Existing {year.name}", academic_year=year, created_at=date(2024, 9, 1), fitness_score=0)
+        session.add(schedule)
+        for course in courses:
+            start_time, end_time = rng.choice(TIME_SLOTS)
+            session.add(ScheduleSlot(
+                schedule=schedule,
+                course=course,
+                teacher=rng.choice(course.teachers),
+                classroom=rng.choice(year.classrooms),
+                day_of_week=rng.choice(DAYS),
+                start_time=start_time,
+                end_time=end_time
+            ))
+    session.commit()
+    return [year.id for year in years[scale.scheduled_years:]]
+
+
+def create_instance(scale, seed=0, db_url='sqlite://'):
+    """Build a synthetic instance in a fresh database (in-memory SQLite by default)"""
+    engine = create_db_engine(db_url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    scale_name = scale if isinstance(scale, str) else None
+    scale = SCALES[scale] if isinstance(scale, str) else scale
+    unscheduled = generate_instance(session, scale, seed)
+    counts = {
+        'years': scale.years,
+        'courses': scale.years * scale.courses_per_year,
+        'teachers': scale.teachers,
+        'classrooms': scale.classrooms,
+        'availability_rows': session.query(TeacherAvailability).count(),
+        'scheduled_slots': session.query(ScheduleSlot).count()
+    }
+    return Instance(session, scale_name or scale, seed, unscheduled[:scale.joint_years], counts)
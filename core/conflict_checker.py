@@ -1,11 +1,22 @@
-from sqlalchemy.orm import Session
-from db.models import ScheduleSlot, Schedule
+from db.schedule_repository import get_all_slots
 
 class ConflictChecker:
     """Check conflicts within schedule or with external schedules"""
     def __init__(self, data_collector):
         self.data_collector = data_collector
         self.session = data_collector.session
+        self.occupancy_index = set()
+        self.refresh_occupancy_index(data_collector.booked_slots)
+
+    def refresh_occupancy_index(self, booked_slots=None):
+        """Snapshot (teacher, day, start, end) keys of saved schedule slots
+
+        booked_slots are rows from DataCollector.load_booked_slots; they are loaded when not given.
+        """
+        if booked_slots is None:
+            booked_slots = self.data_collector.load_booked_slots()
+        self.occupancy_index = {tuple(row) for row in booked_slots}
+        return self.occupancy_index
 
     def check_internal_conflicts(self, individual):
         """Check conflicts within schedule (teacher, classroom, year)"""
@@ -13,66 +24,57 @@ class ConflictChecker:
         used_teacher_slots = set()
         used_classroom_slots = set()
         used_year_slots = set()
-        
-        for slot in individual:
-            key_teacher = (slot['teacher'].id, slot['day'], slot['start_time'], slot['end_time'])
-            key_classroom = (slot['classroom'].id, slot['day'], slot['start_time'], slot['end_time'])
-            key_year = (self.data_collector.academic_year_id, slot['day'], slot['start_time'], slot['end_time'])
-    
+
+        course_years = self.data_collector.course_years
+        for row, (teacher, day, slot, classroom) in enumerate(individual.genes.tolist()):
+            key_teacher = (teacher, day, slot)
+            key_classroom = (classroom, day, slot)
+            key_year = (course_years[row], day, slot)
+
             if key_teacher in used_teacher_slots:
                 penalty += 5  # was 10
             else:
                 used_teacher_slots.add(key_teacher)
-    
+
             if key_classroom in used_classroom_slots:
                 penalty += 3  # was 6
             else:
                 used_classroom_slots.add(key_classroom)
-    
+
             if key_year in used_year_slots:
                 penalty += 2  # was 5
             else:
                 used_year_slots.add(key_year)
-    
+
         return penalty
 
-    def check_teacher_availability(self, slot, available_time_slots):
-        """Check teacher availability for specified slot"""
+    def check_teacher_availability(self, slot, available_slots):
+        """Check teacher availability for specified slot index"""
 
-        if (slot['start_time'], slot['end_time']) not in available_time_slots:
+        if slot not in available_slots:
             return 8
         return 0
 
-    def check_external_conflicts(self, slot, external_conflicts_map):
+    def check_external_conflicts(self, teacher_id, day, time_slot, external_conflicts_map):
         """Check conflicts with external schedules"""
         # External conflict (teacher teaching other year in same slot)
-        teacher_id = slot['teacher'].id
-        day = slot['day']
-        time_slot = (slot['start_time'], slot['end_time'])
-        if (teacher_id in external_conflicts_map and 
-            day in external_conflicts_map[teacher_id] and 
+        if (teacher_id in external_conflicts_map and
+            day in external_conflicts_map[teacher_id] and
             time_slot in external_conflicts_map[teacher_id][day]):
             return 10
         return 0
 
     def check_real_time_conflicts(self, teacher_id, day, start_time, end_time):
-        """Check actual conflicts in database"""
-        # Check conflicts from all saved schedules
-        conflicting_slots = self.session.query(ScheduleSlot).join(Schedule).filter(
-            ScheduleSlot.teacher_id == teacher_id,
-            ScheduleSlot.day_of_week == day,
-            ScheduleSlot.start_time == start_time,
-            ScheduleSlot.end_time == end_time
-        ).all()
-        if len(conflicting_slots) > 0:
-            return 15  
+        """Check actual conflicts against the occupancy snapshot of saved schedules"""
+        if (teacher_id, day, start_time, end_time) in self.occupancy_index:
+            return 15
         return 0
 
     def check_app_conflicts(self):
         """Check conflicts in application directly"""
         print("=== Checking Application Conflicts ===")
 
-        all_schedules = self.session.query(ScheduleSlot).join(Schedule).all()
+        all_schedules = get_all_slots(self.session)
         # Group conflicts by teacher and time
         conflicts_by_teacher = {}
         for slot in all_schedules:
@@ -116,7 +118,7 @@ class ConflictChecker:
         """Check all current conflicts in database"""
         print("=== Checking All Current Conflicts ===")
 
-        all_schedules = self.session.query(ScheduleSlot).join(Schedule).all()
+        all_schedules = get_all_slots(self.session)
 
         teacher_conflicts = {}
         for slot in all_schedules:
@@ -1,17 +1,42 @@
+import logging
 import random
 from datetime import time
+from time import perf_counter
 from sqlalchemy.orm import Session
 from db.models import Teacher, Course, Classroom, AcademicYear, TeacherAvailability, Schedule, ScheduleSlot
 
+logger = logging.getLogger(__name__)
+
 class DataCollector:
     """Collect necessary data from database and prepare the algorithm"""
-    def __init__(self, session: Session, academic_year_id: int):
+    def __init__(self, session: Session, academic_year_id):
+        """academic_year_id may be a single id or a list of ids scheduled jointly"""
         self.session = session
-        self.academic_year_id = academic_year_id
-        self.academic_year = session.query(AcademicYear).get(academic_year_id)
-        self.courses = session.query(Course).join(Course.academic_years).filter(AcademicYear.id == academic_year_id).all()
-        self.teachers = session.query(Teacher).join(Teacher.courses).join(Course.academic_years).filter(AcademicYear.id == academic_year_id).distinct().all()
-        self.classrooms = session.query(Classroom).join(Classroom.academic_years).filter(AcademicYear.id == academic_year_id).all()
+        self.load_timings = {}
+        if isinstance(academic_year_id, (list, tuple)):
+            self.academic_year_ids = list(academic_year_id)
+        else:
+            self.academic_year_ids = [academic_year_id]
+        self.academic_year_id = self.academic_year_ids[0]
+        self.academic_years = [session.query(AcademicYear).get(year_id) for year_id in self.academic_year_ids]
+        self.academic_year = self.academic_years[0]
+
+        # One genome row per (year, course); a course shared by two jointly scheduled
+        # years is taught to each of them. Ordered so that genome rows and indices
+        # match across processes.
+        self.courses = []
+        self.course_years = []
+        self.year_classroom_ids = []
+        for year_index, year_id in enumerate(self.academic_year_ids):
+            year_courses = session.query(Course).join(Course.academic_years).filter(AcademicYear.id == year_id).order_by(Course.id).all()
+            self.courses.extend(year_courses)
+            self.course_years.extend([year_index] * len(year_courses))
+            self.year_classroom_ids.append([
+                classroom_id for (classroom_id,) in
+                session.query(Classroom.id).join(Classroom.academic_years).filter(AcademicYear.id == year_id).order_by(Classroom.id)
+            ])
+        self.teachers = session.query(Teacher).join(Teacher.courses).join(Course.academic_years).filter(AcademicYear.id.in_(self.academic_year_ids)).distinct().order_by(Teacher.id).all()
+        self.classrooms = session.query(Classroom).join(Classroom.academic_years).filter(AcademicYear.id.in_(self.academic_year_ids)).distinct().order_by(Classroom.id).all()
         self.time_slots = [
             (time(8, 0), time(10, 0)),
             (time(10, 0), time(12, 0)),
@@ -20,43 +45,110 @@ class DataCollector:
             (time(16, 0), time(18, 0)),
         ]
         self.days = list(range(5))
+        # Saved schedules this run replaces (warm-start seeds); their slots do not block
+        self.excluded_schedule_ids = frozenset()
         self.teacher_slot_map = self.build_teacher_availability_map()
-        self.external_conflicts_map = self.build_external_conflicts_map()
+        self.booked_slots = self.load_booked_slots()
+        self.external_conflicts_map = self.build_external_conflicts_map(self.booked_slots)
+        self.feasible_slots = self.build_feasible_slot_table()
 
     def build_teacher_availability_map(self):
-        """Build teacher availability map by day and time slot"""
+        """Build teacher availability map by day and time slot
+
+        All availability rows of the year's teachers are read in one query, ordered
+        by start time, and swept against the (start-ordered) time slots: a slot is
+        valid when the latest end among intervals starting at or before it covers
+        its end.
+        """
+        started = perf_counter()
+        teacher_ids = [teacher.id for teacher in self.teachers]
+        rows = self.session.query(
+            TeacherAvailability.teacher_id,
+            TeacherAvailability.day_of_week,
+            TeacherAvailability.start_time,
+            TeacherAvailability.end_time
+        ).filter(
+            TeacherAvailability.teacher_id.in_(teacher_ids),
+            TeacherAvailability.is_available == True
+        ).order_by(
+            TeacherAvailability.teacher_id,
+            TeacherAvailability.day_of_week,
+            TeacherAvailability.start_time
+        ).all()
+
+        intervals = {}
+        for teacher_id, day, start_time, end_time in rows:
+            intervals.setdefault((teacher_id, day), []).append((start_time, end_time))
+
         slot_map = {}
-        for teacher in self.teachers:
-            slot_map[teacher.id] = {}
+        for teacher_id in teacher_ids:
+            slot_map[teacher_id] = {}
             for day in self.days:
+                day_intervals = intervals.get((teacher_id, day), [])
                 valid_slots = []
-                availabilities = self.session.query(TeacherAvailability).filter_by(
-                    teacher_id=teacher.id,
-                    day_of_week=day,
-                    is_available=True
-                ).all()
+                position = 0
+                latest_end = None
                 for slot_start, slot_end in self.time_slots:
-                    for avail in availabilities:
-                        if avail.start_time <= slot_start and avail.end_time >= slot_end:
-                            valid_slots.append((slot_start, slot_end))
-                            break
-                slot_map[teacher.id][day] = valid_slots
+                    while position < len(day_intervals) and day_intervals[position][0] <= slot_start:
+                        interval_end = day_intervals[position][1]
+                        if latest_end is None or interval_end > latest_end:
+                            latest_end = interval_end
+                        position += 1
+                    if latest_end is not None and latest_end >= slot_end:
+                        valid_slots.append((slot_start, slot_end))
+                slot_map[teacher_id][day] = valid_slots
+
+        self.load_timings['teacher_availability'] = perf_counter() - started
+        logger.info("Loaded %d availability rows for %d teachers in %.1f ms", len(rows), len(teacher_ids), self.load_timings['teacher_availability'] * 1000)
         return slot_map
 
-    def build_external_conflicts_map(self):
-        """Build external conflicts map for teachers from existing schedules in the same academic year"""
+    def load_booked_slots(self):
+        """Distinct (teacher_id, day, start, end) rows of saved schedule slots for this run's teachers"""
+        teacher_ids = [teacher.id for teacher in self.teachers]
+        query = self.session.query(
+            ScheduleSlot.teacher_id,
+            ScheduleSlot.day_of_week,
+            ScheduleSlot.start_time,
+            ScheduleSlot.end_time
+        ).join(Schedule).filter(
+            ScheduleSlot.teacher_id.in_(teacher_ids)
+        )
+        if self.excluded_schedule_ids:
+            query = query.filter(Schedule.id.notin_(self.excluded_schedule_ids))
+        return query.distinct().all()
+
+    def build_external_conflicts_map(self, booked_slots=None):
+        """Build external conflicts map for teachers from existing schedules
+
+        booked_slots are rows from load_booked_slots; they are loaded when not given.
+        """
+        if booked_slots is None:
+            booked_slots = self.load_booked_slots()
         conflicts_map = {}
-        
-        existing_schedules = self.session.query(ScheduleSlot).join(Schedule).all()
-
-
-        for slot in existing_schedules:
-            teacher_id = slot.teacher_id
-            day = slot.day_of_week
-            time_slot = (slot.start_time, slot.end_time)
-            if teacher_id not in conflicts_map:
-                conflicts_map[teacher_id] = {}
-            if day not in conflicts_map[teacher_id]:
-                conflicts_map[teacher_id][day] = set()
-            conflicts_map[teacher_id][day].add(time_slot)
+        for teacher_id, day, start_time, end_time in booked_slots:
+            conflicts_map.setdefault(teacher_id, {}).setdefault(day, set()).add((start_time, end_time))
         return conflicts_map
+
+    def build_feasible_slot_table(self, occupancy_index=frozenset()):
+        """Build the immutable teacher x day table of usable slot indices
+
+        feasible_slots[teacher_index][day] lists, in time order, the slots inside the
+        teacher's availability that clash neither with the external conflicts map nor
+        with the occupancy snapshot of saved schedules. Teachers are indexed in
+        self.teachers order.
+        """
+        table = []
+        for teacher in self.teachers:
+            available = self.teacher_slot_map.get(teacher.id, {})
+            booked = self.external_conflicts_map.get(teacher.id, {})
+            table.append(tuple(
+                tuple(
+                    slot for slot, time_slot in enumerate(self.time_slots)
+                    if time_slot in available.get(day, ())
+                    and time_slot not in booked.get(day, ())
+                    and (teacher.id, day) + time_slot not in occupancy_index
+                )
+                for day in self.days
+            ))
+        self.feasible_slots = tuple(table)
+        return self.feasible_slots
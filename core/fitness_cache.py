@@ -0,0 +1,43 @@
+import hashlib
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """Bounded LRU cache of fitness scores keyed by a stable hash of the genome content"""
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(genome):
+        return hashlib.blake2b(genome.key(), digest_size=16).digest()
+
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all scores and counters, e.g. after the conflict data they depend on changed"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_size': len(self.entries)
+        }
@@ -1,11 +1,155 @@
+import logging
+
+import numpy as np
+
+from .fitness_cache import FitnessCache
+from .fitness_kernel import FitnessState, derive_states, key_weights, population_fitness, population_penalties, population_states
+from .phase_timer import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+
 class FitnessCalculator:
     """Calculate fitness score for schedule"""
-    def __init__(self, conflict_checker, individual_generator, data_collector):
+    def __init__(self, conflict_checker, individual_generator, data_collector, cache_size=10000):
         self.conflict_checker = conflict_checker
         self.individual_generator = individual_generator
         self.data_collector = data_collector
+        self.cache = FitnessCache(cache_size)
+        self.vectorized = False
+        self.incremental = False
+        self.verify_incremental = False
+        self.parallel = None
+        self.gene_penalty = None
+        self.key_weights = None
+        self.timer = PhaseTimer()
+
+    def build_penalty_tables(self):
+        """Tabulate the per-slot penalties of calculate_fitness for every (teacher, day, slot)"""
+        codec = self.individual_generator.codec
+        external_conflicts_map = self.data_collector.external_conflicts_map
+        gene_penalty = np.zeros((len(codec.teachers), len(self.data_collector.days), len(codec.time_slots)), dtype=np.int64)
+        for teacher, teacher_id in enumerate(codec.teacher_ids):
+            for day in self.data_collector.days:
+                valid_slots = self.individual_generator.get_available_slot_indices(teacher, day)
+                for slot, (start_time, end_time) in enumerate(codec.time_slots):
+                    gene_penalty[teacher, day, slot] = (
+                        self.conflict_checker.check_teacher_availability(slot, valid_slots) // 2
+                        + self.conflict_checker.check_external_conflicts(teacher_id, day, (start_time, end_time), external_conflicts_map) // 2
+                        + self.conflict_checker.check_real_time_conflicts(teacher_id, day, start_time, end_time) // 2
+                    )
+        self.gene_penalty = gene_penalty
+        self.key_weights = key_weights(gene_penalty, len(codec.classrooms), codec.n_years)
+        return gene_penalty
+
+    def evaluate_population(self, population):
+        """Fitness of every individual, scoring only genomes missing from the cache
+
+        In incremental mode genomes without a FitnessState are scored as well,
+        since their children derive from it.
+        """
+        keys = [self.cache.key(ind) for ind in population]
+        fitnesses = [self.cache.get(key) for key in keys]
+        missing = [
+            i for i, fitness in enumerate(fitnesses)
+            if fitness is None or (self.incremental and population[i].state is None)
+        ]
+        if missing:
+            with self.timer.phase('calculate_fitness'):
+                scores = self.score_population([population[i] for i in missing])
+            for i, fitness in zip(missing, scores):
+                fitnesses[i] = fitness
+                self.cache.put(keys[i], fitness)
+        for ind in population:
+            # Scored genomes must not keep their parents alive
+            ind.origin = None
+        return fitnesses
+
+    def score_population(self, population):
+        """Uncached fitness of every individual
+
+        parallel ships the genomes to the worker pool, incremental updates the
+        parents' occupancy counters, vectorized uses the NumPy batch kernel,
+        otherwise compute_fitness is called.
+        """
+        if self.parallel is not None:
+            return self.parallel.evaluate(population)
+        if not (self.vectorized or self.incremental):
+            return [self.compute_fitness(ind) for ind in population]
+        if self.gene_penalty is None:
+            self.build_penalty_tables()
+        if self.incremental:
+            return self.score_incremental(population)
+        codec = self.individual_generator.codec
+        genes = np.stack([ind.genes for ind in population]) if population else np.empty((0, 0, 4))
+        return population_fitness(genes, self.gene_penalty, len(codec.classrooms), codec.row_years, codec.n_years)
+
+    def score_incremental(self, population):
+        """Fitness of every individual from occupancy counters, storing each one's FitnessState
+
+        A genome whose origin parent has a state copies the parent's counters and
+        replays only its origin rows; other genomes are counted in full. With
+        verify_incremental every penalty is checked against the batch kernel.
+        """
+        codec = self.individual_generator.codec
+        layout = (self.gene_penalty, len(codec.classrooms))
+        penalties = np.zeros(len(population), dtype=np.int64)
+        derived, full = [], []
+        for i, ind in enumerate(population):
+            if ind.origin is not None and ind.origin[0].state is not None:
+                derived.append(i)
+            else:
+                full.append(i)
+
+        if full:
+            individuals = [population[i] for i in full]
+            counts, full_penalties = population_states(
+                np.stack([ind.genes for ind in individuals]), *layout, codec.row_years, codec.n_years
+            )
+            for ind, ind_counts, penalty in zip(individuals, counts, full_penalties.tolist()):
+                ind.state = FitnessState(ind_counts, penalty)
+            penalties[full] = full_penalties
+
+        if derived:
+            children = [population[i] for i in derived]
+            parents = [child.origin[0] for child in children]
+            rows = [child.origin[1] for child in children]
+            # concatenate + reshape copies many small arrays much faster than np.stack
+            gene_shape = (len(children),) + children[0].genes.shape
+            counts, derived_penalties = derive_states(
+                np.concatenate([parent.state.counts for parent in parents]).reshape(len(parents), -1),
+                np.array([parent.state.penalty for parent in parents], dtype=np.int64),
+                np.concatenate([parent.genes for parent in parents]).reshape(gene_shape),
+                np.concatenate([child.genes for child in children]).reshape(gene_shape),
+                np.repeat(np.arange(len(children)), [len(child_rows) for child_rows in rows]),
+                np.concatenate(rows),
+                *layout, codec.row_years, self.key_weights
+            )
+            for child, child_counts, penalty in zip(children, counts, derived_penalties.tolist()):
+                child.state = FitnessState(child_counts, penalty)
+            penalties[derived] = derived_penalties
+
+        if self.verify_incremental and population:
+            expected = population_penalties(np.stack([ind.genes for ind in population]), *layout, codec.row_years, codec.n_years)
+            mismatched = np.flatnonzero(expected != penalties)
+            if len(mismatched):
+                raise AssertionError(
+                    f"Incremental penalties {penalties[mismatched].tolist()} differ from a full "
+                    f"recomputation {expected[mismatched].tolist()} for individuals {mismatched.tolist()}"
+                )
+        return (1.0 / (1 + penalties)).tolist()
 
     def calculate_fitness(self, individual):
+        """Fitness score for schedule, served from the genome-keyed cache when possible"""
+        key = self.cache.key(individual)
+        fitness = self.cache.get(key)
+        if fitness is None:
+            with self.timer.phase('calculate_fitness'):
+                fitness = self.compute_fitness(individual)
+            self.cache.put(key, fitness)
+        return fitness
+
+    def compute_fitness(self, individual):
         """Calculate fitness score for schedule with balanced penalties"""
         penalty = 0
 
@@ -18,19 +162,23 @@ class FitnessCalculator:
         penalty += self.conflict_checker.check_internal_conflicts(individual)
 
 
-        for slot in individual:
-            valid_slots = self.individual_generator.get_available_time_slots(slot['teacher'].id, slot['day'])
+        codec = self.individual_generator.codec
+        external_conflicts_map = self.data_collector.external_conflicts_map
+        for teacher, day, slot, _ in individual.genes.tolist():
+            teacher_id = codec.teacher_ids[teacher]
+            start_time, end_time = codec.time_slots[slot]
+            valid_slots = self.individual_generator.get_available_slot_indices(teacher, day)
             penalty += self.conflict_checker.check_teacher_availability(slot, valid_slots) // 2  # was 8, now 4
 
-            penalty += self.conflict_checker.check_external_conflicts(slot, self.data_collector.external_conflicts_map) // 2  # was 10, now 5
+            penalty += self.conflict_checker.check_external_conflicts(teacher_id, day, (start_time, end_time), external_conflicts_map) // 2  # was 10, now 5
 
             penalty += self.conflict_checker.check_real_time_conflicts(
-                slot['teacher'].id, slot['day'], slot['start_time'], slot['end_time']
+                teacher_id, day, start_time, end_time
             ) // 2  
 
         result = 1 / (1 + penalty)
 
         if not isinstance(result, (int, float)) or isinstance(result, bool):
-            print(f"Warning: Invalid result from calculate_fitness: {result}, data type: {type(result)}")
+            logger.warning("Invalid result from calculate_fitness: %s, data type: %s", result, type(result))
             return 0.0
         return result
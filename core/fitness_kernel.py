@@ -0,0 +1,139 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .genome import TEACHER, DAY, SLOT, CLASSROOM
+
+# Internal clash weights, identical to ConflictChecker.check_internal_conflicts
+TEACHER_CLASH_PENALTY = 5
+CLASSROOM_CLASH_PENALTY = 3
+YEAR_CLASH_PENALTY = 2
+
+
+def count_clashes(keys, n_keys):
+    """Per row of a 2-D key array, count entries whose key already appeared earlier in the row"""
+    n_rows, n_cols = keys.shape
+    offsets = np.arange(n_rows, dtype=np.intp)[:, None] * n_keys
+    counts = np.bincount((keys + offsets).ravel(), minlength=n_rows * n_keys)
+    occupied = np.count_nonzero(counts.reshape(n_rows, n_keys), axis=1)
+    return n_cols - occupied
+
+
+def population_penalties(genes, gene_penalty, n_classrooms, row_years, n_years):
+    """Penalty of every individual in a (population, courses, 4) gene array
+
+    gene_penalty is a (teachers, days, slots) table holding the per-slot
+    availability, external and real-time penalties already halved as in
+    FitnessCalculator.calculate_fitness; row_years gives the academic year
+    index of every course row.
+    """
+    n_teachers, n_days, n_slots = gene_penalty.shape
+    n_times = n_days * n_slots
+
+    teacher = genes[..., TEACHER].astype(np.intp)
+    day = genes[..., DAY].astype(np.intp)
+    slot = genes[..., SLOT].astype(np.intp)
+    classroom = genes[..., CLASSROOM].astype(np.intp)
+    time_key = day * n_slots + slot
+
+    penalty = TEACHER_CLASH_PENALTY * count_clashes(teacher * n_times + time_key, n_teachers * n_times)
+    penalty += CLASSROOM_CLASH_PENALTY * count_clashes(classroom * n_times + time_key, n_classrooms * n_times)
+    penalty += YEAR_CLASH_PENALTY * count_clashes(row_years * n_times + time_key, n_years * n_times)
+    penalty += gene_penalty[teacher, day, slot].sum(axis=1)
+    return penalty
+
+
+def population_fitness(genes, gene_penalty, n_classrooms, row_years, n_years):
+    """Fitness 1 / (1 + penalty) for every individual, as Python floats"""
+    if len(genes) == 0:
+        return []
+    penalty = population_penalties(genes, gene_penalty, n_classrooms, row_years, n_years)
+    return (1.0 / (1 + penalty)).tolist()
+
+
+
+# Occupancy counters of one individual (how many of its genes use each teacher,
+# classroom and year key at each time) and its penalty, for incremental fitness
+FitnessState = namedtuple('FitnessState', ['counts', 'penalty'])
+
+COUNT_DTYPE = np.int16
+
+
+def occupancy_keys(genes, gene_penalty, n_classrooms, years):
+    """Teacher, classroom and year keys of every gene, as a (..., 3) array
+
+    The keys index one counter row of (teachers + classrooms + years) * days * slots
+    entries; years gives the academic year index of every gene row.
+    """
+    n_teachers, n_days, n_slots = gene_penalty.shape
+    n_times = n_days * n_slots
+    time_key = genes[..., DAY].astype(np.intp) * n_slots + genes[..., SLOT]
+    return np.stack((
+        genes[..., TEACHER].astype(np.intp) * n_times + time_key,
+        (n_teachers + genes[..., CLASSROOM].astype(np.intp)) * n_times + time_key,
+        (n_teachers + n_classrooms + years) * n_times + time_key
+    ), axis=-1)
+
+
+def key_weights(gene_penalty, n_classrooms, n_years):
+    """Clash weight of every entry of a counter row"""
+    n_teachers, n_days, n_slots = gene_penalty.shape
+    return np.repeat(
+        [TEACHER_CLASH_PENALTY, CLASSROOM_CLASH_PENALTY, YEAR_CLASH_PENALTY],
+        [n_teachers * n_days * n_slots, n_classrooms * n_days * n_slots, n_years * n_days * n_slots]
+    )
+
+
+def population_states(genes, gene_penalty, n_classrooms, row_years, n_years):
+    """Occupancy counters (population, keys) and penalties of a (population, courses, 4) gene array
+
+    Penalties equal population_penalties: every gene beyond the first on a key
+    is one clash of that key's weight.
+    """
+    weights = key_weights(gene_penalty, n_classrooms, n_years)
+    n_individuals, n_keys = len(genes), len(weights)
+    keys = occupancy_keys(genes, gene_penalty, n_classrooms, row_years)
+    offsets = np.arange(n_individuals, dtype=np.intp)[:, None, None] * n_keys
+    counts = np.bincount((keys + offsets).ravel(), minlength=n_individuals * n_keys)
+    counts = counts.astype(COUNT_DTYPE).reshape(n_individuals, n_keys)
+    penalties = np.maximum(counts - 1, 0) @ weights
+    penalties += gene_penalty[genes[..., TEACHER], genes[..., DAY], genes[..., SLOT]].sum(axis=1)
+    return counts, penalties
+
+
+def derive_states(counts, penalties, parent_genes, child_genes, child_index, rows, gene_penalty, n_classrooms, row_years, weights):
+    """Update copies of parent counters and penalties for the genes their children changed
+
+    counts (children, keys) and penalties (children,) start as the parents'
+    values and are updated in place. parent_genes and child_genes are
+    (children, courses, 4) arrays; child_index and rows list the rows the
+    genetic operators may have changed (repeats allowed). Only those rows are
+    replayed, so the cost is O(changed genes) besides copying the counters.
+    weights is key_weights().
+    """
+    n_children, n_rows = child_genes.shape[:2]
+    candidates = np.zeros(n_children * n_rows, dtype=bool)
+    candidates[child_index * n_rows + rows] = True
+    child_index, rows = np.divmod(np.flatnonzero(candidates), n_rows)
+    # Old and new genes of every candidate row; unchanged rows cancel out
+    genes = np.stack((parent_genes[child_index, rows], child_genes[child_index, rows]))
+
+    n_keys = counts.shape[1]
+    flat = counts.reshape(-1)
+    keys = (occupancy_keys(genes, gene_penalty, n_classrooms, row_years[rows]) + (child_index * n_keys)[:, None]).ravel()
+    touched, inverse = np.unique(keys, return_inverse=True)
+    # The first half of the keys are removed, the second half added
+    signs = np.ones(len(keys))
+    signs[:len(keys) // 2] = -1
+    before = flat[touched]
+    after = before + np.bincount(inverse.ravel(), weights=signs, minlength=len(touched)).astype(COUNT_DTYPE)
+    flat[touched] = after
+    # The clashes on a key are its count beyond one
+    clash_change = (np.maximum(after - 1, 0) - np.maximum(before - 1, 0)) * weights[touched % n_keys]
+    slot_penalty = gene_penalty[genes[..., TEACHER], genes[..., DAY], genes[..., SLOT]]
+    penalties += np.bincount(
+        np.concatenate((touched // n_keys, child_index)),
+        weights=np.concatenate((clash_change, slot_penalty[1] - slot_penalty[0])),
+        minlength=n_children
+    ).astype(penalties.dtype)
+    return counts, penalties
@@ -1,11 +1,20 @@
+import logging
 import random
 
+import numpy as np
+
+from .genome import Genome
+from .phase_timer import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
 class GeneticOperations:
     """Genetic operations like crossover and selection"""
     def __init__(self, individual_generator, fitness_calculator, data_collector):
         self.individual_generator = individual_generator
         self.fitness_calculator = fitness_calculator
         self.data_collector = data_collector
+        self.timer = PhaseTimer()
 
     def crossover(self, parent1, parent2):
         """Crossover operation between two parents to produce two children"""
@@ -16,34 +25,31 @@ class GeneticOperations:
         if len(parent1) < 2 or len(parent2) < 2:
             return parent1, parent2
         
-        point = random.randint(1, min(len(parent1), len(parent2)) - 1)
-        child1 = parent1[:point] + parent2[point:]
-        child2 = parent2[:point] + parent1[point:]
+        n_rows = min(len(parent1), len(parent2))
+        point = random.randint(1, n_rows - 1)
+        child1 = Genome(np.concatenate((parent1.genes[:point], parent2.genes[point:])))
+        child2 = Genome(np.concatenate((parent2.genes[:point], parent1.genes[point:])))
+        # Each child derives from the parent it shares the longer part with
+        if 2 * point >= n_rows:
+            child1.origin = (parent1, np.arange(point, n_rows))
+            child2.origin = (parent2, np.arange(point, n_rows))
+        else:
+            child1.origin = (parent2, np.arange(point))
+            child2.origin = (parent1, np.arange(point))
         return child1, child2
 
     def evolve_population(self, population, elite_size, mutation_rate, population_size):
         """Evolve population through one generation with guaranteed valid individuals"""
-        fitness_cache = {}
         valid_population = []
-    
         for ind in population:
-            try:
-                if ind and len(ind) > 0:
-                    fitness = self.fitness_calculator.calculate_fitness(ind)
-                    fitness_cache[id(ind)] = fitness
-                    valid_population.append(ind)
-                else:
+            if ind and len(ind) > 0:
+                valid_population.append(ind)
+            else:
+                valid_population.append(self.individual_generator.generate_individual())
 
-                    new_ind = self.individual_generator.generate_individual()
-                    fitness_cache[id(new_ind)] = self.fitness_calculator.calculate_fitness(new_ind)
-                    valid_population.append(new_ind)
-            except Exception as e:
-                print(f"Error calculating fitness: {e}")
-                new_ind = self.individual_generator.generate_individual()
-                fitness_cache[id(new_ind)] = self.fitness_calculator.calculate_fitness(new_ind)
-                valid_population.append(new_ind)
-    
-        sorted_population = sorted(valid_population, key=lambda ind: fitness_cache[id(ind)], reverse=True)
+        fitnesses = self.fitness_calculator.evaluate_population(valid_population)
+        ranked = sorted(zip(fitnesses, valid_population), key=lambda pair: pair[0], reverse=True)
+        sorted_population = [ind for _, ind in ranked]
     
         new_population = sorted_population[:elite_size]
     
@@ -52,18 +58,21 @@ class GeneticOperations:
 
                 pool_size = max(len(sorted_population) // 2, 2)
                 parents = random.sample(sorted_population[:pool_size], 2)
-                child1, child2 = self.crossover(parents[0], parents[1])
+                with self.timer.phase('crossover'):
+                    child1, child2 = self.crossover(parents[0], parents[1])
     
                 if child1:
-                    mutated_child1 = self.individual_generator.mutate(child1, mutation_rate)
+                    with self.timer.phase('mutate'):
+                        mutated_child1 = self.individual_generator.mutate(child1, mutation_rate)
                     new_population.append(mutated_child1)
     
                 if len(new_population) < population_size and child2:
-                    mutated_child2 = self.individual_generator.mutate(child2, mutation_rate)
+                    with self.timer.phase('mutate'):
+                        mutated_child2 = self.individual_generator.mutate(child2, mutation_rate)
                     new_population.append(mutated_child2)
     
             except Exception as e:
-                print(f"Error in reproduction: {e}")
+                logger.warning("Error in reproduction: %s", e)
                 new_ind = self.individual_generator.generate_individual()
                 new_population.append(new_ind)
     
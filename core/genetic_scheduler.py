@@ -1,123 +1,481 @@
+import logging
+from collections import namedtuple
 from datetime import datetime
+from time import monotonic, perf_counter
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from db.models import Schedule, ScheduleSlot
+from db.schedule_repository import get_schedule, get_schedules
 
 from .data_collector import DataCollector
 from .conflict_checker import ConflictChecker
+from .genome import Genome, GenomeCodec
 from .individual_generator import IndividualGenerator
 from .fitness_calculator import FitnessCalculator
+from .fitness_kernel import population_fitness
 from .genetic_operations import GeneticOperations
+from .parallel_fitness import ParallelFitnessEvaluator
+from .island_model import IslandModel
 from .schedule_presenter import SchedulePresenter
+from .phase_timer import PhaseTimer
+from .schedule_repair import ScheduleRepairer
+
+logger = logging.getLogger(__name__)
+
+# Outcome of GeneticScheduler.run; stop_reason is one of 'perfect_solution',
+# 'target_fitness', 'stalled', 'time_budget', 'stopped' or 'generations'; timings is the
+# PhaseTimer report when the scheduler was created with timing=True; replaced holds the
+# ids of the saved schedules a warm start revised, for save_schedules(replace_schedule_ids=...)
+RunResult = namedtuple('RunResult', ['best', 'fitness', 'stop_reason', 'timings', 'replaced'], defaults=(None, ()))
+
+# Outcome of GeneticScheduler.repair_schedule; moved, added and removed list
+# {'course', 'before', 'after'} dicts (before/after are (teacher, day, start, end,
+# classroom) or None), unresolved the courses still clashing or unplaceable
+RepairResult = namedtuple('RepairResult', ['schedule', 'moved', 'added', 'removed', 'unresolved', 'fitness', 'seconds'])
+
+# Latest saved schedules per year that a warm start seeds from
+WARM_START_SCHEDULES = 1
 
 class GeneticScheduler:
-    """Main object to run the genetic algorithm"""
-    def __init__(self, session: Session, academic_year_id: int, population_size=50, generations=100, mutation_rate=0.3, elite_size=0):
+    """Main object to run the genetic algorithm
+
+    academic_year_id may also be a list of ids: all their courses are then
+    placed in one genome so that shared teachers and rooms are resolved jointly,
+    and save_schedules writes one Schedule per year.
 
-        self.data_collector = DataCollector(session, academic_year_id)
-        self.teacher_slot_map = self.data_collector.build_teacher_availability_map()
-        self.external_conflicts_map = self.data_collector.build_external_conflicts_map()
+    timing=True records wall time and call counts per pipeline phase in
+    self.timer; disabled phases cost one no-op context manager each.
+    """
+    def __init__(self, session: Session, academic_year_id, population_size=50, generations=100, mutation_rate=0.3, elite_size=0, fitness_cache_size=10000, workers=1, timing=False):
 
+        self.timer = PhaseTimer(timing)
+        with self.timer.phase('data_collection'):
+            self.data_collector = DataCollector(session, academic_year_id)
+        self.teacher_slot_map = self.data_collector.teacher_slot_map
+        self.external_conflicts_map = self.data_collector.external_conflicts_map
+
+        self.codec = GenomeCodec(self.data_collector)
         self.conflict_checker = ConflictChecker(self.data_collector)
-        self.individual_generator = IndividualGenerator(self.data_collector, self.conflict_checker)
-        self.fitness_calculator = FitnessCalculator(self.conflict_checker, self.individual_generator, self.data_collector)
+        self.individual_generator = IndividualGenerator(self.data_collector, self.conflict_checker, self.codec)
+        self.fitness_calculator = FitnessCalculator(self.conflict_checker, self.individual_generator, self.data_collector, fitness_cache_size)
         self.genetic_operations = GeneticOperations(self.individual_generator, self.fitness_calculator, self.data_collector)
-        self.presenter = SchedulePresenter(self.data_collector, self.conflict_checker)
+        self.presenter = SchedulePresenter(self.data_collector, self.conflict_checker, self.codec)
+        self.repairer = ScheduleRepairer(self.data_collector, self.codec)
+        self.individual_generator.timer = self.timer
+        self.fitness_calculator.timer = self.timer
+        self.genetic_operations.timer = self.timer
+        self.data_collector.build_feasible_slot_table(self.conflict_checker.occupancy_index)
+        # The conflict data just loaded serves the first run; later runs reload it
+        self.conflict_data_loaded = True
 
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.elite_size = elite_size
+        self.workers = workers
         self.session = session
-        self.academic_year_id = academic_year_id
+        self.academic_year_ids = self.data_collector.academic_year_ids
+        self.academic_year_id = self.data_collector.academic_year_id
         self.academic_year = self.data_collector.academic_year
 
-    def run(self, progress_callback=None):
-        """Run the complete genetic algorithm"""
-        self.data_collector.external_conflicts_map = self.data_collector.build_external_conflicts_map()
-        self.external_conflicts_map = self.data_collector.external_conflicts_map
+    def run(self, progress_callback=None, vectorized=False, migration=None,
+            stall_generations=None, target_fitness=None, time_budget=None, warm_start=None, stop_event=None,
+            incremental=False, verify_incremental=False):
+        """Run the complete genetic algorithm and return a RunResult
+
+        Besides the generation count, the run stops early on a perfect schedule,
+        when the best fitness has not improved for stall_generations generations,
+        when it reaches target_fitness, once time_budget seconds have passed, or
+        when stop_event (a threading or multiprocessing Event) is set.
+
+        vectorized=True scores each generation with the NumPy batch kernel
+        instead of calling calculate_fitness per individual. incremental=True
+        keeps occupancy counters on every genome and scores a child by updating
+        a copy of its parent's counters for the changed genes only;
+        verify_incremental=True checks each such score against a full
+        recomputation.
 
-        population = [self.individual_generator.generate_individual() for _ in range(self.population_size)]
+        With workers > 1 the scheduler scores populations in a process pool
+        that receives the penalty tables once and the genomes of each
+        generation through shared memory; scores are identical to serial mode.
+
+        migration(generation, population, fitnesses) may return a modified
+        population after each generation; the island model uses it to exchange
+        individuals between sub-populations.
+
+        warm_start (a share between 0 and 1) seeds that part of the initial
+        population from the latest saved schedule of each of the run's years and
+        mutated variants of them. The run revises those schedules: their slots no
+        longer count as conflicts, and RunResult.replaced lists their ids so that
+        the caller may delete them when saving the result.
+        """
+        started = monotonic()
+        deadline = started + time_budget if time_budget else None
+        seed_schedules = self.latest_schedules() if warm_start else []
+        excluded = frozenset(schedule.id for schedules in seed_schedules for schedule in schedules)
+        if excluded != self.data_collector.excluded_schedule_ids:
+            self.data_collector.excluded_schedule_ids = excluded
+            self.conflict_data_loaded = False
+        if not self.conflict_data_loaded:
+            self.refresh_conflict_data()
+        self.conflict_data_loaded = False
+        self.fitness_calculator.cache.clear()
+        self.fitness_calculator.vectorized = vectorized
+        self.fitness_calculator.incremental = incremental
+        self.fitness_calculator.verify_incremental = verify_incremental
+        if vectorized or incremental or self.workers > 1:
+            with self.timer.phase('penalty_tables'):
+                self.fitness_calculator.build_penalty_tables()
+        # Incremental scoring needs the counters in this process, so it replaces the pool
+        if self.workers > 1 and not incremental:
+            self.fitness_calculator.parallel = ParallelFitnessEvaluator(
+                self.workers,
+                self.fitness_calculator.gene_penalty,
+                len(self.codec.classrooms),
+                self.codec.row_years,
+                self.codec.n_years
+            )
+        initial_population = None
+        if excluded:
+            with self.timer.phase('warm_start'):
+                initial_population = self.seed_population(seed_schedules, warm_start)
+        try:
+            result = self.run_generations(progress_callback, migration, stall_generations, target_fitness, deadline, started, initial_population, stop_event)
+            return result._replace(replaced=tuple(sorted(excluded)))
+        finally:
+            if self.fitness_calculator.parallel is not None:
+                self.fitness_calculator.parallel.close()
+                self.fitness_calculator.parallel = None
+
+    def run_generations(self, progress_callback=None, migration=None, stall_generations=None, target_fitness=None, deadline=None, started=None,
+                        initial_population=None, stop_event=None):
+        """Evolve initial_population (a fresh one by default) until a stopping criterion is met"""
+        started = started or monotonic()
+        population = initial_population or [self.individual_generator.generate_individual() for _ in range(self.population_size)]
         best = None
         best_fitness = 0
-        print(f"Starting genetic algorithm with {self.population_size} individuals and {self.generations} generations")
+        last_improvement = 0
+        stop_reason = 'generations'
+        timer = self.timer
+        timer.start_generations()
+        logger.info("Starting genetic algorithm with %d individuals and %d generations", self.population_size, self.generations)
         for generation in range(self.generations):
+            if generation:
+                timer.end_generation()
             try:
 
-                population = self.genetic_operations.evolve_population(population, self.elite_size, self.mutation_rate, self.population_size)
+                with timer.phase('evolve_population'):
+                    population = self.genetic_operations.evolve_population(population, self.elite_size, self.mutation_rate, self.population_size)
 
-                valid_population = []
-                fitnesses = []
-                for ind in population:
-                    if ind and len(ind) > 0:  
-                        try:
-                            fitness = self.fitness_calculator.calculate_fitness(ind)
-                            if isinstance(fitness, (int, float)) and not (isinstance(fitness, bool)):
-                                fitnesses.append(fitness)
-                                valid_population.append(ind)
-                            else:
-                                print(f"Warning: Invalid fitness value in generation {generation}: {fitness}")
-                                fitnesses.append(0.0)
-                                valid_population.append(ind)
-                        except Exception as e:
-                            print(f"Error calculating fitness in generation {generation}: {e}")
-                            fitnesses.append(0.0)
-                            valid_population.append(ind)
+                valid_population = [ind for ind in population if ind and len(ind) > 0]
+                fitnesses = self.fitness_calculator.evaluate_population(valid_population)
                 if valid_population and fitnesses:
                     max_fit = max(fitnesses)
                     avg_fit = sum(fitnesses) / len(fitnesses)
                     if max_fit > best_fitness:
                         best_fitness = max_fit
                         best = valid_population[fitnesses.index(max_fit)]
+                        last_improvement = generation
                         
                     if progress_callback:
                         try:
-                            progress_callback({
-                                'generation': generation,
-                                'best_fitness': best_fitness,
-                                'avg_fitness': avg_fit,
-                                'max_fitness': max_fit
-                            })
+                            with timer.phase('progress_callback'):
+                                progress_callback({
+                                    'generation': generation,
+                                    'best_fitness': best_fitness,
+                                    'avg_fitness': avg_fit,
+                                    'max_fitness': max_fit,
+                                    'elapsed': monotonic() - started,
+                                    **self.fitness_calculator.cache.stats()
+                                })
                         except Exception as e:
-                            print(f"Error in progress callback: {e}")
+                            logger.warning("Error in progress callback: %s", e)
 
                     if generation % 10 == 0:
-                        print(f"Generation {generation}: Best fitness = {max_fit:.4f}, Average fitness = {avg_fit:.4f}")
+                        logger.debug("Generation %d: Best fitness = %.4f, Average fitness = %.4f", generation, max_fit, avg_fit)
                     if best_fitness == 1:
-                        print(f"Perfect solution found in generation {generation}")
+                        logger.info("Perfect solution found in generation %d", generation)
+                        stop_reason = 'perfect_solution'
+                        break
+                    if target_fitness is not None and best_fitness >= target_fitness:
+                        logger.info("Target fitness %s reached in generation %d", target_fitness, generation)
+                        stop_reason = 'target_fitness'
+                        break
+                    if stall_generations and generation - last_improvement >= stall_generations:
+                        logger.info("No improvement for %d generations, stopping at generation %d", stall_generations, generation)
+                        stop_reason = 'stalled'
                         break
+                    if migration is not None:
+                        with timer.phase('migration'):
+                            population = migration(generation, valid_population, fitnesses)
                 else:
-                    print(f"Warning: No valid individuals in generation {generation}")
+                    logger.warning("No valid individuals in generation %d", generation)
                     
                     population = [self.individual_generator.generate_individual() for _ in range(self.population_size)]
             except Exception as e:
-                print(f"Error in generation {generation}: {e}")
+                logger.exception("Error in generation %d: %s", generation, e)
                 
                 population = [self.individual_generator.generate_individual() for _ in range(self.population_size)]
-        print(f"Algorithm finished. Best fitness score: {best_fitness:.4f}")
-        return best, best_fitness
+            if deadline is not None and monotonic() >= deadline:
+                logger.info("Time budget exhausted after generation %d", generation)
+                stop_reason = 'time_budget'
+                break
+            if stop_event is not None and stop_event.is_set():
+                logger.info("Stopped from outside after generation %d", generation)
+                stop_reason = 'stopped'
+                break
+        timer.end_generation()
+        logger.info("Algorithm finished (%s). Best fitness score: %.4f", stop_reason, best_fitness)
+        return RunResult(best, best_fitness, stop_reason, timer.report())
+
+    def latest_schedules(self, limit=WARM_START_SCHEDULES):
+        """Per year of the run, its latest saved schedules with their slots, newest first"""
+        return [
+            get_schedules(self.session, year_id=year_id, with_slots=True, limit=limit)
+            for year_id in self.academic_year_ids
+        ]
+
+    def seed_population(self, seed_schedules, share):
+        """Initial population with a share seeded from saved schedules, the rest random
 
-    def save_schedule(self, individual, name=None):
+        The k-th seed combines every year's k-th latest schedule; further seeded
+        individuals are mutated copies of the seeds.
+        """
+        n_seeded = min(self.population_size, round(share * self.population_size))
+        depth = max((len(schedules) for schedules in seed_schedules), default=0)
+        if not n_seeded or not depth:
+            return None
+        seeds = []
+        for k in range(depth):
+            saved_slots = [
+                (year, slot.course_id, slot.teacher_id, slot.classroom_id, slot.day_of_week, slot.start_time, slot.end_time)
+                for year, schedules in enumerate(seed_schedules) if k < len(schedules)
+                for slot in schedules[k].slots
+            ]
+            seeds.append(self.individual_generator.seed_individual(saved_slots))
+        population = seeds[:n_seeded]
+        while len(population) < n_seeded:
+            population.append(self.individual_generator.mutate(seeds[len(population) % len(seeds)], self.mutation_rate))
+        population += [self.individual_generator.generate_individual() for _ in range(self.population_size - n_seeded)]
+        logger.info("Warm start: %d of %d individuals seeded from %d saved schedules", n_seeded, self.population_size, len(seeds))
+        return population
+
+    def run_islands(self, islands=4, migration_interval=10, migrants=2, topology='ring', progress_callback=None, **run_options):
+        """Island-model run: `islands` sub-populations evolve in separate processes
+        and every `migration_interval` generations send their best `migrants`
+        individuals to a neighbour ('ring') or a random island ('random').
+        Progress payloads carry the reporting 'island' index.
+        """
+        model = IslandModel(self, islands, migration_interval, migrants, topology)
+        # Every island warm-starts from the same latest schedules
+        replaced = sorted(
+            schedule.id for schedules in self.latest_schedules() for schedule in schedules
+        ) if run_options.get('warm_start') else []
+        return model.run(progress_callback, **run_options)._replace(replaced=tuple(replaced))
+
+    def save_schedule(self, individual, name=None, fitness=None, replace_schedule_ids=None):
         """Save schedule to database"""
-        
-        schedule = Schedule(
-            name=name or f"Schedule {self.academic_year.name} - {datetime.now().strftime('%Y-%m-%d')}",
-            academic_year_id=self.academic_year_id,
-            created_at=datetime.now().date(),
-            fitness_score=int(self.fitness_calculator.calculate_fitness(individual) * 100)  
+        if len(self.academic_year_ids) > 1:
+            raise ValueError("This scheduler covers several academic years, use save_schedules")
+        return self.save_schedules(individual, [name] if name else None, fitness, replace_schedule_ids)[0]
+
+    def save_schedules(self, individual, names=None, fitness=None, replace_schedule_ids=None):
+        """Save one schedule per academic year of the genome in a single transaction
+
+        individual may also be a list of (academic_year_id, genome) pairs; each
+        pair becomes one schedule holding that year's rows of the genome, so
+        several candidates are committed at once. fitness (one value, or one
+        per schedule) is the score already known from the run; when omitted the
+        cached fitness of each genome is used, and in joint mode every schedule
+        gets the fitness of the joint genome.
+
+        All slot rows are built before the transaction starts and written with
+        one executemany insert. Schedules in replace_schedule_ids (typically the
+        RunResult.replaced of a warm-started run) that belong to a saved year are
+        deleted in the same transaction.
+        """
+        with self.timer.phase('save_schedule'):
+            if isinstance(individual, Genome):
+                entries = [(year_id, individual) for year_id in self.academic_year_ids]
+            else:
+                entries = list(individual)
+            if fitness is None:
+                fitnesses = [self.fitness_calculator.calculate_fitness(genome) for _, genome in entries]
+            elif isinstance(fitness, (int, float)):
+                fitnesses = [fitness] * len(entries)
+            else:
+                fitnesses = list(fitness)
+            years = {year.id: year for year in self.data_collector.academic_years}
+            unknown = [year_id for year_id, _ in entries if year_id not in years]
+            if unknown:
+                raise ValueError(f"Academic year(s) {unknown} are not covered by this scheduler")
+
+            rows_by_genome = {}
+            entry_rows = []
+            for year_id, genome in entries:
+                if id(genome) not in rows_by_genome:
+                    rows_by_genome[id(genome)] = self.codec.slot_rows(genome)
+                entry_rows.append([row for row in rows_by_genome[id(genome)] if row['academic_year_id'] == year_id])
+
+            created_at = datetime.now()
+            schedules = [
+                Schedule(
+                    name=names[index] if names else f"Schedule {years[year_id].name} - {created_at.strftime('%Y-%m-%d')}",
+                    academic_year_id=year_id,
+                    created_at=created_at.date(),
+                    fitness_score=int(fitness_score * 100)
+                )
+                for index, ((year_id, _), fitness_score) in enumerate(zip(entries, fitnesses))
+            ]
+            saved_year_ids = [year_id for year_id, _ in entries]
+            replaced = [
+                schedule for schedule in get_schedules(self.session, sorted(replace_schedule_ids))
+                if schedule.academic_year_id in saved_year_ids
+            ] if replace_schedule_ids else []
+            for schedule in replaced:
+                self.session.delete(schedule)
+            self.session.add_all(schedules)
+            self.session.flush()
+            slot_rows = [
+                {key: value for key, value in row.items() if key != 'academic_year_id'} | {'schedule_id': schedule.id}
+                for schedule, rows in zip(schedules, entry_rows)
+                for row in rows
+            ]
+            if slot_rows:
+                self.session.execute(insert(ScheduleSlot), slot_rows)
+            self.session.commit()
+            if replaced:
+                logger.info("Replaced schedule(s) %s with the saved result", [schedule.id for schedule in replaced])
+            self.refresh_conflict_data()
+            return schedules
+
+    def repair_schedule(self, schedule_id, max_iterations=1000):
+        """Move only the slots of a saved schedule that the current data makes invalid
+
+        Slots whose teacher no longer teaches the course, whose room left the year,
+        whose time is no longer available or booked elsewhere, or that clash within
+        the schedule are re-placed by a bounded local search (ScheduleRepairer);
+        courses added to the year get a slot and slots of courses removed from it
+        are deleted. Courses left without any teacher or room cannot be placed:
+        they are reported as unresolved and their saved slot, if any, is kept.
+        Everything else stays as saved. The scheduler must cover exactly the
+        schedule's academic year. Returns a RepairResult whose fitness scores the
+        placeable courses.
+        """
+        started = perf_counter()
+        with self.timer.phase('repair_schedule'):
+            schedule = get_schedule(self.session, schedule_id)
+            if schedule is None:
+                raise ValueError(f"Schedule {schedule_id} does not exist")
+            if self.academic_year_ids != [schedule.academic_year_id]:
+                raise ValueError(f"Schedule {schedule_id} belongs to academic year {schedule.academic_year_id}, not to this scheduler's year(s) {self.academic_year_ids}")
+
+            # The schedule's own slots must not block it
+            if self.data_collector.excluded_schedule_ids != {schedule_id}:
+                self.data_collector.excluded_schedule_ids = frozenset([schedule_id])
+                self.refresh_conflict_data()
+
+            codec = self.codec
+            genome = Genome.empty(len(codec.courses))
+            row_slots = {}
+            fixed_keys = []
+            removed = []
+            for slot in schedule.slots:
+                row = codec.course_index.get((0, slot.course_id))
+                if row is None:
+                    removed.append(slot)
+                    continue
+                key = (
+                    codec.teacher_index.get(slot.teacher_id, -1),
+                    slot.day_of_week,
+                    codec.slot_index.get((slot.start_time, slot.end_time), -1),
+                    codec.classroom_index.get(slot.classroom_id, -1)
+                )
+                if row in row_slots:
+                    # A second slot of the same course stays as saved and only occupies its time
+                    fixed_keys.append((key[0], key[3], 0, key[1], key[2]))
+                    continue
+                row_slots[row] = slot
+                genome.genes[row] = key
+
+            invalid = self.repairer.invalid_rows(genome, row_slots, fixed_keys)
+            before = {row: self._slot_label(row_slots[row]) for row in invalid if row in row_slots}
+            unresolved = self.repairer.repair(genome, invalid, fixed_keys, max_iterations)
+            # Courses without any teacher or room keep their genes, possibly -1 sentinels
+            # or zeros: they are reported as unresolved, never scored, written or decoded
+            placed = [row for row in range(len(genome)) if self.repairer.can_place(row)]
+            fitness = float(population_fitness(
+                genome.genes[None, placed], self.fitness_calculator.build_penalty_tables(),
+                len(codec.classrooms), codec.row_years[placed], codec.n_years
+            )[0])
+
+            writable = [row for row in invalid if self.repairer.can_place(row)]
+            moved, added = [], []
+            for row, values in zip(writable, codec.slot_rows(genome, writable)):
+                values = {key: value for key, value in values.items() if key != 'academic_year_id'}
+                teacher, day, slot_index, classroom = genome.genes[row].tolist()
+                change = {
+                    'course': codec.courses[row].name,
+                    'before': before.get(row),
+                    'after': (codec.teachers[teacher].name, day, *codec.time_slots[slot_index], codec.classrooms[classroom].name)
+                }
+                slot = row_slots.get(row)
+                if slot is None:
+                    self.session.add(ScheduleSlot(schedule_id=schedule.id, **values))
+                    added.append(change)
+                    continue
+                if change['after'] == change['before']:
+                    # Nowhere better to go; reported as unresolved
+                    continue
+                for key, value in values.items():
+                    setattr(slot, key, value)
+                moved.append(change)
+            removed_labels = [
+                {'course': slot.course.name, 'before': self._slot_label(slot), 'after': None}
+                for slot in removed
+            ]
+            for slot in removed:
+                self.session.delete(slot)
+            schedule.fitness_score = int(fitness * 100)
+            self.session.commit()
+            self.refresh_conflict_data()
+
+        result = RepairResult(
+            schedule, moved, added, removed_labels,
+            [codec.courses[row].name for row in unresolved],
+            fitness, perf_counter() - started
         )
-        self.session.add(schedule)
-        self.session.flush()  
-
-        for slot in individual:
-            schedule_slot = ScheduleSlot(
-                schedule_id=schedule.id,
-                course_id=slot['course'].id,
-                teacher_id=slot['teacher'].id,
-                classroom_id=slot['classroom'].id,
-                day_of_week=slot['day'],
-                start_time=slot['start_time'],
-                end_time=slot['end_time']
-            )
-            self.session.add(schedule_slot)
+        logger.info(
+            "Repaired schedule %d in %.1f ms: %d moved, %d added, %d removed, %d unresolved",
+            schedule_id, result.seconds * 1000, len(moved), len(added), len(removed_labels), len(unresolved)
+        )
+        return result
+
+    @staticmethod
+    def _slot_label(slot):
+        return (slot.teacher.name, slot.day_of_week, slot.start_time, slot.end_time, slot.classroom.name)
+
+    def delete_schedule(self, schedule_id):
+        """Delete a saved schedule and refresh the occupancy snapshot"""
+        schedule = get_schedule(self.session, schedule_id, with_slots=False)
+        if schedule is None:
+            return False
+        self.session.delete(schedule)
         self.session.commit()
-        return schedule
+        self.refresh_conflict_data()
+        return True
+
+    def refresh_conflict_data(self):
+        """Reload saved-schedule conflicts (one query) and everything derived from them"""
+        with self.timer.phase('refresh_conflict_data'):
+            booked_slots = self.data_collector.load_booked_slots()
+            self.data_collector.booked_slots = booked_slots
+            self.data_collector.external_conflicts_map = self.data_collector.build_external_conflicts_map(booked_slots)
+            self.external_conflicts_map = self.data_collector.external_conflicts_map
+            self.conflict_checker.refresh_occupancy_index(booked_slots)
+            self.data_collector.build_feasible_slot_table(self.conflict_checker.occupancy_index)
+            self.fitness_calculator.cache.clear()
+            # Penalty tables depend on the booked slots; rebuilt on demand
+            self.fitness_calculator.gene_penalty = None
+            self.conflict_data_loaded = True
+
@@ -0,0 +1,116 @@
+import numpy as np
+
+# Column layout of a genome row; row i always belongs to course i of the DataCollector
+# (with several jointly scheduled years, to that course in year course_years[i])
+TEACHER, DAY, SLOT, CLASSROOM = range(4)
+GENE_WIDTH = 4
+GENE_DTYPE = np.int16
+
+
+class Genome:
+    """Compact schedule (individual): one (teacher, day, slot, classroom) index row per course
+
+    state holds the FitnessState of a scored genome in incremental mode. origin
+    is (parent, rows) when crossover or mutation derived the genome from parent
+    by changing at most those rows; it is cleared once the genome is scored.
+    """
+    __slots__ = ('genes', 'state', 'origin')
+
+    def __init__(self, genes):
+        self.genes = genes
+        self.state = None
+        self.origin = None
+
+    @classmethod
+    def empty(cls, n_courses):
+        return cls(np.zeros((n_courses, GENE_WIDTH), dtype=GENE_DTYPE))
+
+    def __len__(self):
+        return len(self.genes)
+
+    def copy(self):
+        return Genome(self.genes.copy())
+
+    def key(self):
+        """Raw gene bytes, equal for equal schedules"""
+        return self.genes.tobytes()
+
+
+class GenomeCodec:
+    """Index tables translating between compact genomes and ORM-backed slot dicts"""
+    def __init__(self, data_collector):
+        self.courses = data_collector.courses
+        self.academic_year_ids = data_collector.academic_year_ids
+        self.teachers = data_collector.teachers
+        self.classrooms = data_collector.classrooms
+        self.time_slots = data_collector.time_slots
+
+        self.teacher_ids = tuple(teacher.id for teacher in self.teachers)
+        self.teacher_index = {teacher_id: i for i, teacher_id in enumerate(self.teacher_ids)}
+        self.classroom_index = {classroom.id: i for i, classroom in enumerate(self.classrooms)}
+        self.slot_index = {time_slot: i for i, time_slot in enumerate(self.time_slots)}
+        # Year index of every row and (year index, course id) -> row
+        self.row_years = np.array(data_collector.course_years, dtype=np.intp)
+        self.n_years = len(self.academic_year_ids)
+        self.course_index = {
+            (year, course.id): i for i, (year, course) in enumerate(zip(data_collector.course_years, self.courses))
+        }
+        # Candidate teacher and classroom indices per course row
+        self.course_teachers = [
+            tuple(self.teacher_index[teacher.id] for teacher in course.teachers)
+            for course in self.courses
+        ]
+        year_classrooms = [
+            tuple(self.classroom_index[classroom_id] for classroom_id in classroom_ids)
+            for classroom_ids in data_collector.year_classroom_ids
+        ]
+        self.course_classrooms = [year_classrooms[year] for year in data_collector.course_years]
+
+    def decode(self, genome):
+        """Expand a genome into the list-of-dicts form used for saving and display"""
+        individual = []
+        for course, year, (teacher, day, slot, classroom) in zip(self.courses, self.row_years.tolist(), genome.genes.tolist()):
+            start_time, end_time = self.time_slots[slot]
+            individual.append({
+                'academic_year_id': self.academic_year_ids[year],
+                'course': course,
+                'teacher': self.teachers[teacher],
+                'classroom': self.classrooms[classroom],
+                'day': day,
+                'start_time': start_time,
+                'end_time': end_time
+            })
+        return individual
+
+    def slot_rows(self, genome, rows=None):
+        """Column values of the schedule_slots rows of a genome (or of the given row indices), ready for a bulk insert"""
+        classroom_ids = [classroom.id for classroom in self.classrooms]
+        row_years = self.row_years.tolist()
+        genes = genome.genes.tolist()
+        return [
+            {
+                'academic_year_id': self.academic_year_ids[row_years[row]],
+                'course_id': self.courses[row].id,
+                'teacher_id': self.teacher_ids[teacher],
+                'classroom_id': classroom_ids[classroom],
+                'day_of_week': day,
+                'start_time': self.time_slots[slot][0],
+                'end_time': self.time_slots[slot][1]
+            }
+            for row in (range(len(genes)) if rows is None else rows)
+            for teacher, day, slot, classroom in (genes[row],)
+        ]
+
+    def encode(self, individual):
+        """Pack a list-of-dicts schedule into a genome"""
+        genome = Genome.empty(len(self.courses))
+        for slot in individual:
+            year = self.academic_year_ids.index(slot.get('academic_year_id', self.academic_year_ids[0]))
+            row = self.course_index[(year, slot['course'].id)]
+            genome.genes[row] = (
+                self.teacher_index[slot['teacher'].id],
+                slot['day'],
+                self.slot_index[(slot['start_time'], slot['end_time'])],
+                self.classroom_index[slot['classroom'].id]
+            )
+        return genome
@@ -1,115 +1,123 @@
 import random
 
+import numpy as np
+
+from .genome import Genome
+from .phase_timer import PhaseTimer
+
 
 class IndividualGenerator:
     """Create and modify schedules (individuals)"""
-    def __init__(self, data_collector, conflict_checker):
+    def __init__(self, data_collector, conflict_checker, codec):
         self.data_collector = data_collector
         self.conflict_checker = conflict_checker
+        self.codec = codec
+        self.timer = PhaseTimer()
 
     def get_available_time_slots(self, teacher_id, day):
         """Get available time slots while avoiding actual conflicts"""
-        base_slots = self.data_collector.teacher_slot_map.get(teacher_id, {}).get(day, [])
-        available_slots = []
-        
-        for slot_start, slot_end in base_slots:
-            # Check external conflicts from map
-            if teacher_id in self.data_collector.external_conflicts_map and day in self.data_collector.external_conflicts_map[teacher_id]:
-                if (slot_start, slot_end) in self.data_collector.external_conflicts_map[teacher_id][day]:
-                    continue  # Skip this slot if it conflicts
-                
-            # Check real-time conflicts
-            if not self.conflict_checker.check_real_time_conflicts(teacher_id, day, slot_start, slot_end):
-                available_slots.append((slot_start, slot_end))
-        return available_slots
+        teacher = self.codec.teacher_index.get(teacher_id)
+        if teacher is None:
+            return []
+        return [self.codec.time_slots[slot] for slot in self.data_collector.feasible_slots[teacher][day]]
+
+    def get_available_slot_indices(self, teacher, day):
+        """Indexed variant of get_available_time_slots for a teacher index"""
+        return self.data_collector.feasible_slots[teacher][day]
 
     def generate_individual(self):
         """Generate a random schedule (individual) with repair to ensure completeness"""
-        individual = []
-        max_attempts_per_course = 50  
+        with self.timer.phase('generate_individual'):
+            genome = Genome.empty(len(self.codec.courses))
+            genes = genome.genes
+            days = self.data_collector.days
+            n_time_slots = len(self.codec.time_slots)
+            max_attempts_per_course = 50
 
-        for course in self.data_collector.courses:
-            slot_added = False
-            attempts = 0
-            while not slot_added and attempts < max_attempts_per_course:
-                attempts += 1
-                # اختيار مدرس متاح
-                teacher = random.choice(course.teachers)
-                # اختيار يوم عشوائي
-                day = random.choice(self.data_collector.days)
-                # الحصول على الأوقات المتاحة للمدرس في هذا اليوم
-                available_slots = self.get_available_time_slots(teacher.id, day)
-                # إزالة slots التي فيها conflicts خارجية
-                teacher_conflicts = self.data_collector.external_conflicts_map.get(teacher.id, {}).get(day, set())
-                available_slots = [slot for slot in available_slots if slot not in teacher_conflicts]
+            for row, (teachers, classrooms) in enumerate(zip(self.codec.course_teachers, self.codec.course_classrooms)):
+                slot_added = False
+                attempts = 0
+                while not slot_added and attempts < max_attempts_per_course:
+                    attempts += 1
+                    # اختيار مدرس متاح
+                    teacher = random.choice(teachers)
+                    # اختيار يوم عشوائي
+                    day = random.choice(days)
+                    # الحصول على الأوقات المتاحة للمدرس في هذا اليوم (بدون conflicts خارجية)
+                    available_slots = self.get_available_slot_indices(teacher, day)
 
-                if available_slots:
-                    start_time, end_time = random.choice(available_slots)
-                    classroom = random.choice(self.data_collector.classrooms)
-                    individual.append({
-                        'course': course,
-                        'teacher': teacher,
-                        'classroom': classroom,
-                        'day': day,
-                        'start_time': start_time,
-                        'end_time': end_time
-                    })
-                    slot_added = True
+                    if available_slots:
+                        genes[row] = (teacher, day, random.choice(available_slots), random.choice(classrooms))
+                        slot_added = True
 
-            # **Repair:** إذا لم ينجح الاختيار العشوائي، نجرب كل المدرسين وكل الأيام
-            if not slot_added:
-                for teacher in course.teachers:
-                    for day in self.data_collector.days:
-                        available_slots = self.get_available_time_slots(teacher.id, day)
-                        teacher_conflicts = self.data_collector.external_conflicts_map.get(teacher.id, {}).get(day, set())
-                        available_slots = [slot for slot in available_slots if slot not in teacher_conflicts]
-                        if available_slots:
-                            start_time, end_time = random.choice(available_slots)
-                            classroom = random.choice(self.data_collector.classrooms)
-                            individual.append({
-                                'course': course,
-                                'teacher': teacher,
-                                'classroom': classroom,
-                                'day': day,
-                                'start_time': start_time,
-                                'end_time': end_time
-                            })
-                            slot_added = True
+                # **Repair:** إذا لم ينجح الاختيار العشوائي، نجرب كل المدرسين وكل الأيام
+                if not slot_added:
+                    for teacher in teachers:
+                        for day in days:
+                            available_slots = self.get_available_slot_indices(teacher, day)
+                            if available_slots:
+                                genes[row] = (teacher, day, random.choice(available_slots), random.choice(classrooms))
+                                slot_added = True
+                                break
+                        if slot_added:
                             break
-                    if slot_added:
-                        break
 
-            # إذا لم نتمكن من وضع الحصة، نضعها مؤقتًا على أي يوم/وقت/مدرس للقضاء على المادة المفقودة
-            if not slot_added:
-                teacher = random.choice(course.teachers)
-                day = random.choice(self.data_collector.days)
-                start_time, end_time = random.choice(self.data_collector.time_slots)
-                classroom = random.choice(self.data_collector.classrooms)
-                individual.append({
-                    'course': course,
-                    'teacher': teacher,
-                    'classroom': classroom,
-                    'day': day,
-                    'start_time': start_time,
-                    'end_time': end_time
-                })
-        return individual
+                # إذا لم نتمكن من وضع الحصة، نضعها مؤقتًا على أي يوم/وقت/مدرس للقضاء على المادة المفقودة
+                if not slot_added:
+                    genes[row] = (
+                        random.choice(teachers),
+                        random.choice(days),
+                        random.randrange(n_time_slots),
+                        random.choice(classrooms)
+                    )
+            return genome
+
+    def seed_individual(self, saved_slots):
+        """Schedule rebuilt from saved slots, placing afresh every row they no longer fit
+
+        saved_slots holds (year index, course_id, teacher_id, classroom_id, day, start, end)
+        rows. A saved assignment is kept when its course is still in the run, its
+        teacher still teaches the course, its room is still linked to the year and its
+        slot is still feasible for the teacher; other rows keep a random placement.
+        """
+        with self.timer.phase('seed_individual'):
+            genome = self.generate_individual()
+            genes = genome.genes
+            feasible_slots = self.data_collector.feasible_slots
+            for year, course_id, teacher_id, classroom_id, day, start_time, end_time in saved_slots:
+                row = self.codec.course_index.get((year, course_id))
+                if row is None:
+                    continue
+                teacher = self.codec.teacher_index.get(teacher_id)
+                classroom = self.codec.classroom_index.get(classroom_id)
+                slot = self.codec.slot_index.get((start_time, end_time))
+                if (teacher in self.codec.course_teachers[row]
+                        and classroom in self.codec.course_classrooms[row]
+                        and day in self.data_collector.days
+                        and slot in feasible_slots[teacher][day]):
+                    genes[row] = (teacher, day, slot, classroom)
+            return genome
 
     def mutate(self, individual, mutation_rate):
-        """Apply mutation to schedule"""
-        for slot in individual:
+        """Apply mutation to a copy of the schedule"""
+        source = individual
+        individual = individual.copy()
+        genes = individual.genes
+        days = self.data_collector.days
+        mutated = []
+        for row, (teachers, classrooms) in enumerate(zip(self.codec.course_teachers, self.codec.course_classrooms)):
             if random.random() < mutation_rate:
-                day = random.choice(self.data_collector.days)
-                teacher = random.choice(slot['course'].teachers)
-                valid_slots = self.get_available_time_slots(teacher.id, day)
-                # Avoid external conflicts
-                teacher_id = teacher.id
-                if teacher_id in self.data_collector.external_conflicts_map and day in self.data_collector.external_conflicts_map[teacher_id]:
-                    external_conflicts = self.data_collector.external_conflicts_map[teacher_id][day]
-                    valid_slots = [slot for slot in valid_slots if slot not in external_conflicts]
+                day = random.choice(days)
+                teacher = random.choice(teachers)
+                # External conflicts are already excluded from the available slots
+                valid_slots = self.get_available_slot_indices(teacher, day)
                 if valid_slots:
-                    slot['day'] = day
-                    slot['start_time'], slot['end_time'] = random.choice(valid_slots)
-                    slot['classroom'] = random.choice(self.data_collector.classrooms)
-                    slot['teacher'] = teacher
-        return individual
\ No newline at end of file
+                    genes[row] = (teacher, day, random.choice(valid_slots), random.choice(classrooms))
+                    mutated.append(row)
+        # An unscored crossover child passes on its own parent and changed rows
+        if source.origin is not None:
+            parent, rows = source.origin
+            individual.origin = (parent, np.concatenate((rows, np.array(mutated, dtype=np.intp))))
+        else:
+            individual.origin = (source, np.array(mutated, dtype=np.intp))
+        return individual
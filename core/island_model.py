@@ -0,0 +1,143 @@
+import logging
+import multiprocessing
+import queue
+import random
+
+from sqlalchemy.orm import sessionmaker
+
+from db.database import create_db_engine
+from .genome import Genome
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGIES = ('ring', 'random')
+
+
+def _run_island(island, db_url, academic_year_id, settings, run_options, migration_interval, migrants, topology, seed, inboxes, events, stop):
+    """Worker process: evolve one sub-population and exchange migrants with the others
+
+    The island stops at the next generation boundary once stop is set, and sets it
+    itself when it finds a perfect schedule.
+    """
+    from .genetic_scheduler import GeneticScheduler
+
+    for inbox in inboxes:
+        # Leftover migrants must not keep a finished island from exiting
+        inbox.cancel_join_thread()
+    random.seed(seed)
+    session = sessionmaker(bind=create_db_engine(db_url))()
+    try:
+        scheduler = GeneticScheduler(session, academic_year_id, **settings)
+        n_islands = len(inboxes)
+
+        def migrate(generation, population, fitnesses):
+            if n_islands < 2 or (generation + 1) % migration_interval:
+                return population
+            ranked = sorted(range(len(population)), key=fitnesses.__getitem__, reverse=True)
+            outgoing = [population[i].genes for i in ranked[:migrants]]
+            if topology == 'ring':
+                target = (island + 1) % n_islands
+            else:
+                target = random.choice([i for i in range(n_islands) if i != island])
+            inboxes[target].put(outgoing)
+
+            incoming = []
+            while True:
+                try:
+                    incoming.extend(inboxes[island].get_nowait())
+                except queue.Empty:
+                    break
+            # Migrants replace the worst individuals, never the elites
+            replaceable = ranked[scheduler.elite_size:][::-1]
+            for index, genes in zip(replaceable, incoming):
+                population[index] = Genome(genes)
+            return population
+
+        def report(info):
+            events.put(('progress', island, info))
+
+        result = scheduler.run(progress_callback=report, migration=migrate, stop_event=stop, **run_options)
+        if result.stop_reason == 'perfect_solution':
+            stop.set()
+        events.put(('result', island, result.best.genes if result.best is not None else None, result.fitness, result.stop_reason))
+    finally:
+        session.close()
+
+
+class IslandModel:
+    """Run K GeneticScheduler sub-populations in separate processes with periodic migration"""
+    def __init__(self, scheduler, islands=4, migration_interval=10, migrants=2, topology='ring'):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology '{topology}', expected one of {TOPOLOGIES}")
+        db_url = scheduler.session.get_bind().url
+        if db_url.get_backend_name() == 'sqlite' and db_url.database in (None, '', ':memory:'):
+            raise ValueError("Island mode needs a database file that worker processes can open")
+        self.scheduler = scheduler
+        self.db_url = db_url.render_as_string(hide_password=False)
+        self.islands = islands
+        self.migration_interval = max(1, migration_interval)
+        self.migrants = migrants
+        self.topology = topology
+
+    def run(self, progress_callback=None, **run_options):
+        """Evolve all islands and return the RunResult of the best one"""
+        from .genetic_scheduler import RunResult
+
+        scheduler = self.scheduler
+        settings = {
+            'population_size': scheduler.population_size,
+            'generations': scheduler.generations,
+            'mutation_rate': scheduler.mutation_rate,
+            'elite_size': scheduler.elite_size,
+            'fitness_cache_size': scheduler.fitness_calculator.cache.max_size
+        }
+        context = multiprocessing.get_context('spawn')
+        inboxes = [context.Queue() for _ in range(self.islands)]
+        events = context.Queue()
+        # Set by the first island with a perfect schedule so that the others stop too
+        stop = context.Event()
+        processes = [
+            context.Process(
+                target=_run_island,
+                args=(island, self.db_url, scheduler.academic_year_ids, settings, run_options,
+                      self.migration_interval, self.migrants, self.topology,
+                      random.getrandbits(32), inboxes, events, stop),
+                daemon=True
+            )
+            for island in range(self.islands)
+        ]
+        for process in processes:
+            process.start()
+
+        island_best = [0.0] * self.islands
+        results = {}
+        try:
+            while len(results) < self.islands:
+                try:
+                    event = events.get(timeout=1)
+                except queue.Empty:
+                    failed = [i for i, p in enumerate(processes) if i not in results and p.exitcode not in (None, 0)]
+                    if failed:
+                        raise RuntimeError(f"Island process(es) {failed} exited without a result")
+                    continue
+                if event[0] == 'progress':
+                    _, island, info = event
+                    island_best[island] = max(island_best[island], info['best_fitness'])
+                    if progress_callback:
+                        try:
+                            progress_callback({**info, 'island': island, 'islands_best_fitness': list(island_best)})
+                        except Exception as e:
+                            logger.warning("Error in progress callback: %s", e)
+                else:
+                    _, island, genes, fitness, stop_reason = event
+                    results[island] = RunResult(Genome(genes) if genes is not None else None, fitness, stop_reason)
+        finally:
+            # Also ends the remaining islands when the parent gives up early
+            stop.set()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        logger.info("Island model finished. Best fitness per island: %s", [round(results[i].fitness, 4) for i in sorted(results)])
+        return max(results.values(), key=lambda result: result.fitness)
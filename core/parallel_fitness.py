@@ -0,0 +1,86 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .fitness_kernel import population_fitness
+from .genome import GENE_DTYPE, GENE_WIDTH
+
+# Read-only problem snapshot installed once in every worker process
+_snapshot = {}
+
+
+def _init_worker(gene_penalty, n_classrooms, row_years, n_years):
+    _snapshot['gene_penalty'] = gene_penalty
+    _snapshot['n_classrooms'] = n_classrooms
+    _snapshot['row_years'] = row_years
+    _snapshot['n_years'] = n_years
+
+
+def _score_rows(buffer_name, shape, start, stop):
+    """Score rows [start, stop) of the population stored in shared memory"""
+    buffer = shared_memory.SharedMemory(name=buffer_name)
+    try:
+        genes = np.ndarray(shape, dtype=GENE_DTYPE, buffer=buffer.buf)
+        fitnesses = population_fitness(
+            genes[start:stop],
+            _snapshot['gene_penalty'],
+            _snapshot['n_classrooms'],
+            _snapshot['row_years'],
+            _snapshot['n_years']
+        )
+        del genes
+        return fitnesses
+    finally:
+        buffer.close()
+
+
+class ParallelFitnessEvaluator:
+    """Score compact genomes in a process pool fed through a shared-memory gene buffer"""
+    def __init__(self, workers, gene_penalty, n_classrooms, row_years, n_years):
+        self.workers = workers
+        # spawn keeps workers free of the parent's DB connections and threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(gene_penalty, n_classrooms, row_years, n_years)
+        )
+        self.buffer = None
+
+    def _ensure_buffer(self, nbytes):
+        if self.buffer is not None and self.buffer.size >= nbytes:
+            return
+        self._release_buffer()
+        self.buffer = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+
+    def _release_buffer(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer.unlink()
+            self.buffer = None
+
+    def evaluate(self, population):
+        """Fitness of every genome, in population order"""
+        if not population:
+            return []
+        shape = (len(population), len(population[0]), GENE_WIDTH)
+        self._ensure_buffer(int(np.prod(shape)) * np.dtype(GENE_DTYPE).itemsize)
+        genes = np.ndarray(shape, dtype=GENE_DTYPE, buffer=self.buffer.buf)
+        np.stack([ind.genes for ind in population], out=genes)
+        del genes
+
+        bounds = np.linspace(0, len(population), min(self.workers, len(population)) + 1).astype(int)
+        futures = [
+            self.executor.submit(_score_rows, self.buffer.name, shape, int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        fitnesses = []
+        for future in futures:
+            fitnesses.extend(future.result())
+        return fitnesses
+
+    def close(self):
+        self.executor.shutdown()
+        self._release_buffer()
@@ -0,0 +1,81 @@
+from time import perf_counter
+
+
+class _NullPhase:
+    """Shared no-op context returned while timing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, perf_counter() - self.started)
+        return False
+
+
+class PhaseTimer:
+    """Cumulative and per-generation wall time and call counts of named pipeline phases
+
+    Phases may nest (evolve_population includes the calculate_fitness calls made
+    inside it), so durations are inclusive and do not sum to the run time.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.totals = {}
+        self.calls = {}
+        self.current = {}
+        self.generations = []
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def start_generations(self):
+        """Drop the per-generation buckets of a previous run"""
+        self.current = {}
+        self.generations = []
+
+    def end_generation(self):
+        """Close the per-generation bucket of the phases timed since the last call"""
+        if self.enabled:
+            self.generations.append(self.current)
+            self.current = {}
+
+    def report(self):
+        """Plain-dict summary, or None while timing is disabled"""
+        if not self.enabled:
+            return None
+        return {
+            'phases': {
+                name: {'seconds': seconds, 'calls': self.calls[name]}
+                for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1])
+            },
+            'generations': [dict(generation) for generation in self.generations]
+        }
@@ -2,9 +2,10 @@ import pandas as pd
 
 class SchedulePresenter:
     """Display and analyze schedules"""
-    def __init__(self, data_collector, conflict_checker):
+    def __init__(self, data_collector, conflict_checker, codec):
         self.data_collector = data_collector
         self.conflict_checker = conflict_checker
+        self.codec = codec
 
     def get_schedule_as_dataframe(self, individual):
         """Convert schedule to DataFrame for display"""
@@ -13,7 +14,7 @@ class SchedulePresenter:
         time_slots_str = [f"{slot[0].strftime('%H:%M')}-{slot[1].strftime('%H:%M')}" for slot in self.data_collector.time_slots]
         df = pd.DataFrame(index=time_slots_str, columns=days_names)
         # Fill DataFrame with data
-        for slot in individual:
+        for slot in self.codec.decode(individual):
             day = days_names[slot['day']]
             time_slot = f"{slot['start_time'].strftime('%H:%M')}-{slot['end_time'].strftime('%H:%M')}"
             # Format cell content
@@ -33,10 +34,10 @@ class SchedulePresenter:
         used_teacher_slots = set()
         used_classroom_slots = set()
         used_year_slots = set()
-        for i, slot in enumerate(individual):
+        for i, slot in enumerate(self.codec.decode(individual)):
             key_teacher = (slot['teacher'].id, slot['day'], slot['start_time'], slot['end_time'])
             key_classroom = (slot['classroom'].id, slot['day'], slot['start_time'], slot['end_time'])
-            key_year = (self.data_collector.academic_year_id, slot['day'], slot['start_time'], slot['end_time'])
+            key_year = (slot['academic_year_id'], slot['day'], slot['start_time'], slot['end_time'])
 
             # Teacher conflicts
             if key_teacher in used_teacher_slots:
@@ -65,7 +66,7 @@ class SchedulePresenter:
                 conflicts['year_conflicts'].append({
                     'slot_index': i,
                     'course': slot['course'].name,
-                    'year': self.data_collector.academic_year_id,
+                    'year': slot['academic_year_id'],
                     'day': slot['day'],
                     'time': f"{slot['start_time']}-{slot['end_time']}"
                 })
@@ -87,18 +88,11 @@ class SchedulePresenter:
                 })
 
             # Availability violations
-            valid_slots = self.individual_generator.get_available_time_slots(slot['teacher'].id, slot['day']) # This needs to be passed or accessed differently
-            # For now, we'll re-calculate it here as a quick fix, but ideally it should be passed from the generator or recalculated efficiently
-            base_slots = self.data_collector.teacher_slot_map.get(slot['teacher'].id, {}).get(slot['day'], [])
-            available_slots = []
-            for slot_start, slot_end in base_slots:
-                if slot['teacher'].id in self.data_collector.external_conflicts_map and slot['day'] in self.data_collector.external_conflicts_map[slot['teacher'].id]:
-                    if (slot_start, slot_end) in self.data_collector.external_conflicts_map[slot['teacher'].id][slot['day']]:
-                        continue
-                if not self.conflict_checker.check_real_time_conflicts(slot['teacher'].id, slot['day'], slot_start, slot_end):
-                    available_slots.append((slot_start, slot_end))
+            teacher = self.codec.teacher_index[slot['teacher'].id]
+            available_slots = self.data_collector.feasible_slots[teacher][slot['day']]
+            slot_number = self.codec.slot_index[(slot['start_time'], slot['end_time'])]
 
-            if (slot['start_time'], slot['end_time']) not in available_slots:
+            if slot_number not in available_slots:
                 conflicts['availability_violations'].append({
                     'slot_index': i,
                     'teacher': slot['teacher'].name,
@@ -133,7 +127,7 @@ class SchedulePresenter:
         days_names = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday']
         # Group slots by day
         schedule_by_day = {day: [] for day in range(7)}
-        for slot in individual:
+        for slot in self.codec.decode(individual):
             day = slot['day']
             schedule_by_day[day].append(slot)
         # Display detailed schedule
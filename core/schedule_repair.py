@@ -0,0 +1,129 @@
+import random
+from collections import Counter
+
+from .fitness_kernel import CLASSROOM_CLASH_PENALTY, TEACHER_CLASH_PENALTY, YEAR_CLASH_PENALTY
+from .genome import TEACHER, DAY, SLOT, CLASSROOM
+
+
+class ScheduleRepairer:
+    """Re-place the invalid rows of a saved schedule's genome, keeping every other row fixed
+
+    A row is invalid when its teacher no longer teaches the course, its room is no
+    longer linked to the year, its slot is outside the teacher's availability or
+    booked by another schedule, or it clashes with an earlier row of the schedule.
+    """
+    def __init__(self, data_collector, codec):
+        self.data_collector = data_collector
+        self.codec = codec
+
+    def can_place(self, row):
+        """Whether the row's course has any teacher and room to be placed with at all"""
+        return bool(self.codec.course_teachers[row] and self.codec.course_classrooms[row] and self.data_collector.days)
+
+    def is_placeable(self, row, teacher, day, slot, classroom):
+        """Whether (teacher, day, slot, classroom) indices respect the current data for the row"""
+        return (teacher in self.codec.course_teachers[row]
+                and classroom in self.codec.course_classrooms[row]
+                and day in self.data_collector.days
+                and slot in self.data_collector.feasible_slots[teacher][day])
+
+    def invalid_rows(self, genome, placed_rows, fixed_keys=()):
+        """Rows of the genome that must move: unplaced, no longer placeable, or clashing
+
+        placed_rows are the rows that hold a saved assignment; fixed_keys are
+        (teacher, classroom, year, day, slot) keys of saved slots outside the genome.
+        """
+        teacher_used, classroom_used, year_used = self._occupancy(fixed_keys)
+        invalid = []
+        for row, (teacher, day, slot, classroom) in enumerate(genome.genes.tolist()):
+            if row not in placed_rows or not self.is_placeable(row, teacher, day, slot, classroom):
+                invalid.append(row)
+                continue
+            year = int(self.codec.row_years[row])
+            keys = ((teacher, day, slot), (classroom, day, slot), (year, day, slot))
+            if teacher_used[keys[0]] or classroom_used[keys[1]] or year_used[keys[2]]:
+                invalid.append(row)
+                continue
+            teacher_used[keys[0]] += 1
+            classroom_used[keys[1]] += 1
+            year_used[keys[2]] += 1
+        return invalid
+
+    def repair(self, genome, rows, fixed_keys=(), max_iterations=1000, rng=random):
+        """Move only the given rows, in place, by greedy placement plus min-conflicts search
+
+        Candidates respect the course's teachers and rooms and the teachers'
+        feasible slots; among the least clashing ones the closest to the row's
+        current assignment wins. Returns the rows still clashing or unplaceable.
+        Rows that cannot be placed at all (see can_place) keep their genes, which
+        may be sentinels, and take no part in the search.
+        """
+        genes = genome.genes
+        rows = set(rows)
+        stuck = {row for row in rows if not self.can_place(row)}
+        moving = rows - stuck
+        teacher_used, classroom_used, year_used = self._occupancy(fixed_keys)
+        for row in range(len(genes)):
+            if row not in rows:
+                self._add(genes, row, teacher_used, classroom_used, year_used, 1)
+
+        previous = {row: tuple(genes[row].tolist()) for row in moving}
+        candidates = {row: self._candidates(row) for row in moving}
+        unplaceable = {row for row in moving if not candidates[row]}
+        for row in unplaceable:
+            candidates[row] = self._candidates(row, feasible_only=False)
+
+        def clashes(row, teacher, day, slot, classroom, own=0):
+            year = int(self.codec.row_years[row])
+            return (TEACHER_CLASH_PENALTY * (teacher_used[(teacher, day, slot)] - own)
+                    + CLASSROOM_CLASH_PENALTY * (classroom_used[(classroom, day, slot)] - own)
+                    + YEAR_CLASH_PENALTY * (year_used[(year, day, slot)] - own))
+
+        def place(row):
+            before = previous[row]
+            options = candidates[row][:]
+            rng.shuffle(options)
+            genes[row] = min(options, key=lambda candidate: (
+                clashes(row, *candidate),
+                sum(a != b for a, b in zip(candidate, before))
+            ))
+            self._add(genes, row, teacher_used, classroom_used, year_used, 1)
+
+        # Most constrained rows first
+        for row in sorted(moving, key=lambda row: len(candidates[row])):
+            place(row)
+
+        for _ in range(max_iterations):
+            conflicted = [row for row in moving if clashes(row, *genes[row].tolist(), own=1)]
+            if not conflicted:
+                break
+            row = rng.choice(conflicted)
+            self._add(genes, row, teacher_used, classroom_used, year_used, -1)
+            place(row)
+
+        return sorted(stuck | unplaceable | {row for row in moving if clashes(row, *genes[row].tolist(), own=1)})
+
+    def _candidates(self, row, feasible_only=True):
+        n_slots = range(len(self.codec.time_slots))
+        return [
+            (teacher, day, slot, classroom)
+            for teacher in self.codec.course_teachers[row]
+            for day in self.data_collector.days
+            for slot in (self.data_collector.feasible_slots[teacher][day] if feasible_only else n_slots)
+            for classroom in self.codec.course_classrooms[row]
+        ]
+
+    def _occupancy(self, fixed_keys):
+        teacher_used, classroom_used, year_used = Counter(), Counter(), Counter()
+        for teacher, classroom, year, day, slot in fixed_keys:
+            teacher_used[(teacher, day, slot)] += 1
+            classroom_used[(classroom, day, slot)] += 1
+            year_used[(year, day, slot)] += 1
+        return teacher_used, classroom_used, year_used
+
+    def _add(self, genes, row, teacher_used, classroom_used, year_used, sign):
+        gene = genes[row]
+        day, slot = int(gene[DAY]), int(gene[SLOT])
+        teacher_used[(int(gene[TEACHER]), day, slot)] += sign
+        classroom_used[(int(gene[CLASSROOM]), day, slot)] += sign
+        year_used[(int(self.codec.row_years[row]), day, slot)] += sign
@@ -1,25 +1,99 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
 from db.models import Base
 
 DB_PATH = "sqlite:///university_scheduler.db"
 
+# Environment overrides for the shared engine
+DATABASE_URL = os.environ.get("SCHEDULER_DATABASE_URL", DB_PATH)
+POOL_SETTINGS = {
+    'pool_size': int(os.environ.get("SCHEDULER_DB_POOL_SIZE", 5)),
+    'max_overflow': int(os.environ.get("SCHEDULER_DB_MAX_OVERFLOW", 10)),
+    'pool_timeout': float(os.environ.get("SCHEDULER_DB_POOL_TIMEOUT", 30)),
+    'pool_recycle': int(os.environ.get("SCHEDULER_DB_POOL_RECYCLE", 3600)),
+    'pool_pre_ping': True
+}
+
+# Applied to every new SQLite connection: WAL lets readers run during a write,
+# NORMAL sync is safe with WAL, cache_size is in KiB when negative (64 MiB)
+# and mmap_size in bytes (256 MiB)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 268435456
+}
+
 _engine = None
-_session = None
+# One session per thread: each Streamlit script run, generation job or worker
+# gets its own, opened and closed by session_scope
+Session = scoped_session(sessionmaker())
 
-def get_engine():
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def create_db_engine(url=None, **pool_settings):
+    """Engine factory shared by the app, the GA worker processes and the benchmarks"""
+    url = make_url(url or DATABASE_URL)
+    options = {}
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        # In-memory SQLite uses a single-connection pool without these settings
+        options = {**POOL_SETTINGS, **pool_settings}
+    engine = create_engine(url, echo=False, future=True, **options)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', set_sqlite_pragmas)
+    return engine
+
+def configure_engine(url=None, **pool_settings):
+    """Replace the shared engine, e.g. to point the app at another database"""
     global _engine
+    Session.remove()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = create_db_engine(url, **pool_settings)
+    Session.configure(bind=_engine)
+    return _engine
+
+def get_engine():
     if _engine is None:
-        _engine = create_engine(DB_PATH, echo=False, future=True)
+        configure_engine()
     return _engine
 
 def get_session(engine=None):
-    global _session
-    if engine is None:
-        engine = get_engine()
-    if _session is None:
-        _session = sessionmaker(bind=engine)()
-    return _session
+    """Session of the current thread; a separate session when bound to another engine"""
+    if engine is not None and engine is not get_engine():
+        return sessionmaker(bind=engine)()
+    get_engine()
+    return Session()
+
+@contextmanager
+def session_scope():
+    """Open the current thread's session for a unit of work and close it afterwards
+
+    Callers commit their own writes; uncommitted work is rolled back. Nested
+    scopes in the same thread share the outer session.
+    """
+    get_engine()
+    if Session.registry.has():
+        yield Session()
+        return
+    session = Session()
+    try:
+        yield session
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        Session.remove()
 
 def create_tables(engine=None):
     if engine is None:
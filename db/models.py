@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Boolean, Time, Date, Text, create_engine
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Boolean, Time, Date, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
@@ -56,6 +56,9 @@ class Teacher(Base):
 
 class TeacherAvailability(Base):
     __tablename__ = 'teacher_availabilities'
+    __table_args__ = (
+        Index('ix_teacher_availabilities_teacher_day', 'teacher_id', 'day_of_week', 'is_available'),
+    )
     
     id = Column(Integer, primary_key=True)
     teacher_id = Column(Integer, ForeignKey('teachers.id'), nullable=False)
@@ -119,6 +122,10 @@ class Schedule(Base):
 
 class ScheduleSlot(Base):
     __tablename__ = 'schedule_slots'
+    __table_args__ = (
+        Index('ix_schedule_slots_teacher_time', 'teacher_id', 'day_of_week', 'start_time', 'end_time'),
+        Index('ix_schedule_slots_schedule_id', 'schedule_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     schedule_id = Column(Integer, ForeignKey('schedules.id'), nullable=False)
@@ -136,14 +143,3 @@ class ScheduleSlot(Base):
     
     def __repr__(self):
         return f"<ScheduleSlot(course='{self.course.name}', day='{self.day_of_week}')>"
-
-def get_engine(db_path="sqlite:///university_scheduler.db"):
-    return create_engine(db_path)
-
-
-def get_session(engine):
-    Session = sessionmaker(bind=engine)
-    return Session()
-
-def create_tables(engine):
-    Base.metadata.create_all(engine)
\ No newline at end of file
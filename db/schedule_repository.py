@@ -0,0 +1,44 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from db.models import Schedule, ScheduleSlot
+
+# Slots with everything a timetable shows: one extra SELECT for all slots of all loaded
+# schedules, with course, teacher and classroom joined in
+SLOTS_WITH_ENTITIES = selectinload(Schedule.slots).options(
+    joinedload(ScheduleSlot.course),
+    joinedload(ScheduleSlot.teacher),
+    joinedload(ScheduleSlot.classroom)
+)
+
+
+def _schedules(session, with_slots):
+    options = [joinedload(Schedule.academic_year)]
+    if with_slots:
+        options.append(SLOTS_WITH_ENTITIES)
+    return session.query(Schedule).options(*options)
+
+
+def get_schedule(session, schedule_id, with_slots=True):
+    """One schedule with its year (and slots with their entities) in at most two queries, or None"""
+    return _schedules(session, with_slots).filter(Schedule.id == schedule_id).one_or_none()
+
+
+def get_schedules(session, schedule_ids=None, year_id=None, with_slots=False, limit=None):
+    """Schedules newest first with their years, optionally filtered, in one or two queries"""
+    query = _schedules(session, with_slots)
+    if schedule_ids is not None:
+        query = query.filter(Schedule.id.in_(schedule_ids))
+    if year_id is not None:
+        query = query.filter(Schedule.academic_year_id == year_id)
+    query = query.order_by(Schedule.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_all_slots(session):
+    """Every saved slot with its schedule and course, in one query"""
+    return session.query(ScheduleSlot).options(
+        joinedload(ScheduleSlot.schedule),
+        joinedload(ScheduleSlot.course)
+    ).order_by(ScheduleSlot.id).all()
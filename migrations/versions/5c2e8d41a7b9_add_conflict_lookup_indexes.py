@@ -0,0 +1,42 @@
+"""Add conflict lookup indexes
+
+Revision ID: 5c2e8d41a7b9
+Revises: 03bd8972024c
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8d41a7b9'
+down_revision: Union[str, Sequence[str], None] = '03bd8972024c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_schedule_slots_teacher_time',
+        'schedule_slots',
+        ['teacher_id', 'day_of_week', 'start_time', 'end_time'],
+        unique=False
+    )
+    op.create_index('ix_schedule_slots_schedule_id', 'schedule_slots', ['schedule_id'], unique=False)
+    op.create_index(
+        'ix_teacher_availabilities_teacher_day',
+        'teacher_availabilities',
+        ['teacher_id', 'day_of_week', 'is_available'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_teacher_availabilities_teacher_day', table_name='teacher_availabilities')
+    op.drop_index('ix_schedule_slots_schedule_id', table_name='schedule_slots')
+    op.drop_index('ix_schedule_slots_teacher_time', table_name='schedule_slots')
@@ -52,7 +52,8 @@ try:
             )
             
             # تشغيل الخوارزمية
-            best_individual, best_fitness = scheduler.run()
+            result = scheduler.run()
+            best_individual, best_fitness = result.best, result.fitness
             
             if best_individual:
                 print(f"✅ تم إنشاء جدول بنجاح!")
@@ -61,7 +62,7 @@ try:
                 
                 # حفظ الجدول
                 schedule_name = f"جدول السنة {i} - {academic_year.name}"
-                saved_schedule = scheduler.save_schedule(best_individual, schedule_name)
+                saved_schedule = scheduler.save_schedule(best_individual, schedule_name, best_fitness)
                 print(f"   - تم حفظ الجدول: {saved_schedule.id}")
                 
                 # إضافة الجدول إلى القائمة
@@ -69,6 +70,7 @@ try:
                     'year': academic_year,
                     'schedule': saved_schedule,
                     'individual': best_individual,
+                    'slots': scheduler.codec.decode(best_individual),
                     'fitness': best_fitness
                 })
                 
@@ -102,7 +104,7 @@ try:
         # تجميع جميع الفترات
         all_slots = []
         for schedule_info in generated_schedules:
-            for slot in schedule_info['individual']:
+            for slot in schedule_info['slots']:
                 all_slots.append({
                     'teacher_id': slot['teacher'].id,
                     'teacher_name': slot['teacher'].name,
@@ -162,7 +164,7 @@ try:
         conflict_free_schedules = sum(1 for s in generated_schedules if all(
             not final_scheduler.check_real_time_conflicts(
                 slot['teacher'].id, slot['day'], slot['start_time'], slot['end_time']
-            ) for slot in s['individual']
+            ) for slot in s['slots']
         ))
         
         print(f"إجمالي الجداول المولدة: {total_schedules}")